@@ -0,0 +1,64 @@
+"""
+Compares the caller-side cost of logging through EnterpriseLogger's queue
+pipeline against the previous synchronous FileHandler + JSON formatter setup.
+
+    python benchmarks/bench_logger.py -n 20000
+"""
+import argparse
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.core.engine.logger import EnterpriseLogger, JsonFormatter
+
+# Loggers are process-wide; each measurement gets a fresh one
+_runs = itertools.count()
+
+
+def sync_logger(log_dir):
+    # The handler layout EnterpriseLogger used before the queue pipeline
+    logger = logging.getLogger(f"bench.sync.{next(_runs)}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(os.path.join(log_dir, "sync.json"))
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    return logger, handler.close
+
+
+def queued_logger(log_dir):
+    enterprise = EnterpriseLogger(f"bench.queued.{next(_runs)}", log_dir=log_dir)
+    enterprise.logger.propagate = False
+    # Console output would dominate both measurements
+    enterprise.listener.handlers = tuple(h for h in enterprise.listener.handlers if type(h) is not logging.StreamHandler)
+    return enterprise.logger, enterprise.close
+
+
+def measure(factory, n):
+    with tempfile.TemporaryDirectory() as log_dir:
+        logger, close = factory(log_dir)
+        started = time.perf_counter()
+        for i in range(n):
+            logger.info("[Builder] act - attempt | wrote src/main.py", extra={"role": "Builder", "step": "Code Generation", "attempt": i})
+        hot_path = time.perf_counter() - started
+        close()
+        total = time.perf_counter() - started
+    return {"hot_path_us": hot_path / n * 1e6, "total_s": total, "records_per_s": n / hot_path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="records per run")
+    args = parser.parse_args()
+    for name, factory in (("sync FileHandler", sync_logger), ("queue pipeline", queued_logger)):
+        result = measure(factory, args.n)
+        print(f"{name:18s} {result['hot_path_us']:8.2f} us/record on caller  {result['records_per_s']:10.0f} rec/s  {result['total_s']:.3f} s incl. drain")
+
+
+if __name__ == "__main__":
+    main()
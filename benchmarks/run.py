@@ -0,0 +1,405 @@
+"""
+Benchmark suite for the orchestration core. Results are written as a JSON
+baseline that a later run can be compared against.
+
+    python benchmarks/run.py run --out benchmarks/baseline.json
+    python benchmarks/run.py run --full --out current.json      # adds 10^6 messages
+    python benchmarks/run.py compare benchmarks/baseline.json current.json
+
+`compare` exits with status 1 when any case got slower than the threshold.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.agents.base import Role
+from src.agents.context_budget import ContextBudget, PACKERS
+from src.core.engine.memory_manager import MemoryManager
+from src.core.engine.message_log import MessageLog
+from src.core.engine.message_pool import Message, MessagePool
+from src.core.engine.sop_executor import SOPExecutor, Environment
+from src.core.sop.validators import VALIDATORS
+from benchmarks.bench_logger import measure as measure_logger, queued_logger
+
+FORMAT_VERSION = 1
+DEFAULT_SIZES = (1000, 10000, 100000)
+FULL_SIZES = DEFAULT_SIZES + (1000000,)
+MIN_SAMPLE_S = 0.05
+ROLES = ("User", "Guide", "Planner", "Architect", "Structurer", "Builder", "Tester", "Shipper")
+OUTPUT = "TITLE: {0}\nPURPOSE: benchmark\nOUTPUT: {1}\nNEXT STEP: next"
+
+
+_scratch_dirs = []
+
+
+def scratch_dir():
+    # Removed by remove_scratch_dirs() once the cases using it are done
+    path = tempfile.mkdtemp(prefix="autodev-bench-")
+    _scratch_dirs.append(path)
+    return path
+
+
+def remove_scratch_dirs():
+    while _scratch_dirs:
+        shutil.rmtree(_scratch_dirs.pop(), ignore_errors=True)
+
+
+def make_messages(n):
+    # Round-robin roles with a small set of distinct bodies, like retried steps
+    bodies = [OUTPUT.format(role, "x" * 200 + str(i)) for i, role in enumerate(ROLES * 4)]
+    return [Message(role=ROLES[i % len(ROLES)], content=bodies[i % len(bodies)], sent_from=ROLES[i % len(ROLES)]) for i in range(n)]
+
+
+def filled_pool(n):
+    pool = MessagePool()
+    for m in make_messages(n):
+        pool.publish(m)
+    return pool
+
+
+class BenchAgent(Role):
+    def __init__(self, name, listens_to):
+        super().__init__(name=name, profile=name, goal="", constraints="")
+        self.subscribe({listens_to})
+
+    def act(self, message_pool):
+        context = self.observe_all(message_pool)
+        output = OUTPUT.format(self.name, len(context))
+        message_pool.publish(Message(role=self.profile, content=output, sent_from=self.name))
+        return output
+
+
+# Each case takes a size and returns (operation, operations per call). Setup
+# happens outside the timed region; the operation is timed on its own.
+
+def case_pool_publish(n):
+    messages = make_messages(n)
+
+    def op():
+        pool = MessagePool()
+        for m in messages:
+            pool.publish(m)
+    return op, n
+
+
+def case_log_publish(n):
+    n = min(n, 100000)  # one write per message
+    messages = make_messages(n)
+    tmp = scratch_dir()
+
+    def op():
+        pool = MessagePool(log=MessageLog(tempfile.mkdtemp(dir=tmp)))
+        for m in messages:
+            pool.publish(m)
+        pool.log.close()
+    return op, n
+
+
+def case_log_replay(n):
+    path = os.path.join(scratch_dir(), "session")
+    pool = MessagePool(log=MessageLog(path))
+    for m in make_messages(n):
+        pool.publish(m)
+    pool.log.close()
+
+    def op():
+        MessagePool(log=MessageLog(path)).log.close()
+    return op, n
+
+
+def case_pool_fetch_role(n):
+    pool = filled_pool(n)
+    return (lambda: pool.fetch(("Planner", "Architect"))), 1
+
+
+def case_pool_fetch_since(n):
+    pool = filled_pool(n)
+    tail = n - 10
+
+    def op():
+        for _ in range(1000):
+            pool.fetch(("Planner", "Architect"), since=tail)
+    return op, 1000
+
+
+def case_pool_find_latest(n):
+    pool = filled_pool(n)
+
+    def op():
+        for _ in range(1000):
+            pool.find_latest("Builder")
+    return op, 1000
+
+
+def case_role_observe_catch_up(n):
+    pool = filled_pool(n)
+
+    def op():
+        BenchAgent("Tester", "Builder").observe(pool)
+    return op, 1
+
+
+def case_role_observe_incremental(n):
+    pool = filled_pool(n)
+    agent = BenchAgent("Tester", "Builder")
+    agent.observe(pool)
+
+    def op():
+        for _ in range(1000):
+            agent.observe(pool)
+    return op, 1000
+
+
+def budget_case(strategy):
+    def case(n):
+        pool = filled_pool(n)
+        agent = BenchAgent("Tester", "Builder")
+        agent.context_budget = ContextBudget(max_tokens=8000, strategy=strategy)
+        agent.observe(pool)
+        return (lambda: agent.observe_all(pool)), 1
+    case.__name__ = f"case_budget_{strategy}"
+    return case
+
+
+def _failure(i):
+    return {"step": "Code Generation", "agent": "Builder", "error": f"validation failed on attempt {i}: missing 'Created'"}
+
+
+def case_memory_add(n):
+    n = min(n, 100000)  # one locked append per record
+    tmp = scratch_dir()
+
+    def op():
+        memory = MemoryManager(tempfile.mkdtemp(dir=tmp))
+        for i in range(n):
+            memory.add_failure(_failure(i))
+    return op, n
+
+
+def case_memory_load(n):
+    tmp = scratch_dir()
+    with open(os.path.join(tmp, "past_failures.jsonl"), "w") as f:
+        f.writelines(json.dumps(_failure(i)) + "\n" for i in range(n))
+
+    def op():
+        MemoryManager(tmp).count("failures")
+    return op, 1
+
+
+def case_memory_first_recall(n):
+    tmp = scratch_dir()
+    with open(os.path.join(tmp, "past_failures.jsonl"), "w") as f:
+        f.writelines(json.dumps(_failure(i)) + "\n" for i in range(n))
+
+    def op():
+        # A new process's first recall; the untimed warm-up call saves the index the timed calls load
+        MemoryManager(tmp).recall("validation failed Created", kind="failures", k=5)
+    return op, 1
+
+
+def case_memory_recall(n):
+    tmp = scratch_dir()
+    with open(os.path.join(tmp, "past_failures.jsonl"), "w") as f:
+        f.writelines(json.dumps(_failure(i)) + "\n" for i in range(n))
+    memory = MemoryManager(tmp)
+    memory.recall("warm up", kind="failures")  # builds the index outside the timed region
+
+    def op():
+        for _ in range(100):
+            memory.recall("validation failed Created", kind="failures", k=5)
+    return op, 100
+
+
+def _validator_input(name, size):
+    filler = "lorem ipsum dolor sit amet " * (size // 27 + 1)
+    if name == "validate_design":
+        return filler + json.dumps({"modules": [f"m{i}" for i in range(size // 20)], "files": []}) + filler
+    tags = "Goals Risks Requirements Artifacts Ready Stored in Created test APPROVED"
+    # Tags at the end, so every validator scans the whole input
+    return filler + OUTPUT.format("Large", tags)
+
+
+def validator_case(name):
+    def case(n):
+        content = _validator_input(name, n * 100)
+        validator = VALIDATORS[name]
+        assert validator(content), f"{name} rejects its benchmark input"
+        return (lambda: validator(content)), 1
+    case.__name__ = f"case_{name}"
+    return case
+
+
+def case_sop_run(n):
+    steps = max(2, n // 1000)  # 1k messages -> 1 step is meaningless; size is scaled to steps
+    tmp = scratch_dir()
+    previous, workflow = "User", []
+    for i in range(steps):
+        workflow.append({"step": f"S{i}", "agent": f"S{i}", "requires": [previous], "produces": [], "validator": "validate_simplicity", "max_retries": 0})
+        previous = f"S{i}"
+    path = os.path.join(tmp, "workflow.json")
+    with open(path, "w") as f:
+        json.dump(workflow, f)
+
+    def op():
+        env = Environment()
+        for i in range(steps):
+            env.add_role(BenchAgent(f"S{i}", workflow[i]["requires"][0]))
+        sop = SOPExecutor(env, None, None, workflow_path=path)
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                assert sop.run("benchmark")
+            finally:
+                sys.stdout = stdout
+    return op, steps
+
+
+def case_logger(n):
+    n = min(n, 100000)
+    return (lambda: measure_logger(queued_logger, n)), n
+
+
+CASES = {
+    "message_pool.publish": case_pool_publish,
+    "message_pool.fetch_role": case_pool_fetch_role,
+    "message_pool.fetch_since": case_pool_fetch_since,
+    "message_pool.find_latest": case_pool_find_latest,
+    "message_log.publish": case_log_publish,
+    "message_log.replay": case_log_replay,
+    "role.observe_catch_up": case_role_observe_catch_up,
+    "role.observe_incremental": case_role_observe_incremental,
+    **{f"role.context_{strategy}": budget_case(strategy) for strategy in PACKERS},
+    "memory.add": case_memory_add,
+    "memory.load": case_memory_load,
+    "memory.first_recall": case_memory_first_recall,
+    "memory.recall": case_memory_recall,
+    **{f"validators.{name}": validator_case(name) for name in VALIDATORS},
+    "sop_executor.run": case_sop_run,
+    "logger.queued": case_logger,
+}
+
+
+def _timed(op, loops):
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            op()
+        return (time.perf_counter() - started) / loops
+    finally:
+        gc.enable()
+
+
+def time_case(case, size, repeat, min_sample_s=MIN_SAMPLE_S):
+    """
+    Times one case at one size. Fast operations are looped until a sample takes
+    at least `min_sample_s` (as timeit's autorange does), so sub-millisecond
+    cases are not dominated by timer noise. Times are per call of the operation.
+    """
+    op, ops = case(size)
+    loops = 1
+    while _timed(op, loops) * loops < min_sample_s and loops < 1 << 16:
+        loops *= 2
+    samples = [_timed(op, loops) for _ in range(repeat)]
+    return {
+        "size": size,
+        "ops": ops,
+        "loops": loops,
+        "repeat": repeat,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "per_op_us": min(samples) / ops * 1e6,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeat=5, only=None, log=print):
+    results = {}
+    try:
+        for name, case in CASES.items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            for size in sizes:
+                key = f"{name}[{size}]"
+                results[key] = time_case(case, size, repeat)
+                log(f"{key:45s} {results[key]['min_s'] * 1000:10.3f} ms  {results[key]['per_op_us']:10.3f} us/op")
+    finally:
+        remove_scratch_dirs()
+    return {
+        "version": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.25, metric="min_s"):
+    """
+    Returns one row per case present in both runs, with `ratio` = current / baseline.
+    A row is a regression when the ratio exceeds 1 + threshold.
+    """
+    rows = []
+    for key, base in baseline["results"].items():
+        now = current["results"].get(key)
+        if now is None or not base[metric]:
+            continue
+        ratio = now[metric] / base[metric]
+        rows.append({"case": key, "baseline": base[metric], "current": now[metric], "ratio": ratio, "regression": ratio > 1 + threshold})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoDev Studio core benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and optionally write a baseline")
+    run.add_argument("--out", metavar="FILE", help="Write results as JSON to FILE")
+    run.add_argument("--full", action="store_true", help="Include 10^6-message sizes")
+    run.add_argument("--sizes", type=int, nargs="+", help="Explicit sizes (overrides --full)")
+    run.add_argument("--repeat", type=int, default=5, help="Timed repetitions per case (default: %(default)s)")
+    run.add_argument("--only", nargs="+", metavar="PATTERN", help="Only run cases whose name contains PATTERN")
+
+    cmp = commands.add_parser("compare", help="Compare two result files and flag regressions")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging, as a fraction (default: %(default)s)")
+    cmp.add_argument("--metric", choices=("min_s", "median_s"), default="min_s")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        sizes = args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES)
+        report = run_suite(sizes, args.repeat, args.only)
+        if args.out:
+            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"[*] Results written to {args.out}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.metric)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['case']:45s} {row['baseline'] * 1000:10.3f} ms -> {row['current'] * 1000:10.3f} ms  x{row['ratio']:.2f}  {flag}")
+    regressions = [row for row in rows if row["regression"]]
+    print(f"[*] {len(rows)} cases compared, {len(regressions)} regressions (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,69 @@
 import abc
+import copy
 from src.core.engine.message_pool import Message
+from src.core.engine.recall_index import record_text
 
 class Role(abc.ABC):
-    def __init__(self, name, profile, goal, constraints, memory=None):
+    # Roles that write files outside the message pool; their attempts are never speculated,
+    # since an abandoned attempt would keep writing into the shared workspace
+    writes_workspace = False
+
+    def __init__(self, name, profile, goal, constraints, memory=None, context_budget=None):
         self.name = name
         self.profile = profile
         self.goal = goal
         self.constraints = constraints
         self.memory = memory
+        self.context_budget = context_budget # ContextBudget, or None for unbounded context
         self.subscription = set()
         self._rc = [] # Role context (messages observed)
+        self._cursor = -1 # Seq of the last message observed
+        self._observed_pool = None
 
     def subscribe(self, roles: set):
+        if not set(roles) <= self.subscription:
+            # Older messages from newly subscribed roles must be picked up again
+            self._observed_pool = None
         self.subscription.update(roles)
 
     def observe(self, message_pool):
         """
-        MetaGPT Observation Phase: Fetch messages subscribed to.
+        MetaGPT Observation Phase: Fetch subscribed messages published since the last
+        observation and append them to the role context.
         """
-        all_msgs = message_pool.fetch()
-        # Filter messages based on subscription
-        observed = [m for m in all_msgs if m.role in self.subscription]
-        self._rc = observed
+        if message_pool is not self._observed_pool:
+            self._observed_pool = message_pool
+            self._rc = []
+            self._cursor = -1
+        # The pool's per-role indexes already filter by subscription
+        observed = message_pool.fetch(self, since=self._cursor)
+        if observed:
+            self._rc.extend(observed)
+            self._cursor = observed[-1].seq
         return observed
 
+    def observe_all(self, message_pool):
+        """
+        Catch up with the pool and return the observed context, packed into the
+        role's context budget when it has one.
+        """
+        self.observe(message_pool)
+        if self.context_budget is None:
+            return self._rc
+        return self.context_budget.pack(self._rc)
+
+    def fork(self):
+        """
+        A shallow copy with its own observation state, so several attempts of a
+        step can act concurrently without sharing a role context.
+        """
+        clone = copy.copy(self)
+        clone.subscription = set(self.subscription)
+        clone._rc = []
+        clone._cursor = -1
+        clone._observed_pool = None
+        return clone
+
     @abc.abstractmethod
     def act(self, message_pool):
         """
@@ -31,10 +71,28 @@ class Role(abc.ABC):
         """
         pass
 
-    def get_memory_context(self):
+    def state_key(self):
+        """
+        Anything besides the observed messages that the role's output depends on,
+        such as files it reads; it is folded into the step's checkpoint key.
+        """
+        return None
+
+    def restore(self, output):
+        """
+        Re-applies the side effects of a checkpointed `output` when its step is
+        replayed. False if they cannot be restored, so the step runs again.
+        """
+        return True
+
+    def get_memory_context(self, query=None, k=3):
         if self.memory:
-            lessons = self.memory.get_all_memory()
-            return f"\n[RECALLING MEMORY]\n- Past Failures: {len(lessons['failures'])}\n- Successful Patterns: {len(lessons['patterns'])}\n"
+            counts = self.memory.counts()
+            context = f"\n[RECALLING MEMORY]\n- Past Failures: {counts['failures']}\n- Successful Patterns: {counts['patterns']}\n"
+            if query:
+                lessons = self.memory.recall(query, k=k)
+                context += "".join(f"- Lesson: {record_text(lesson)[:200]}\n" for lesson in lessons)
+            return context
         return ""
 
     def __repr__(self):
@@ -0,0 +1,105 @@
+from src.core.engine.message_pool import Message
+
+# Rough bytes per token for English prose and code, used to turn token budgets into bytes
+BYTES_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[... {0} older bytes truncated]"
+
+def _size(message):
+    if message.size is None:  # not published yet
+        message.size = len(str(message.content).encode("utf-8"))
+    return message.size
+
+def _truncated(message, limit):
+    """An unpublished copy of `message` cut to at most `limit` bytes, marker included."""
+    marker = TRUNCATION_MARKER.format(_size(message))
+    room = limit - len(marker.encode("utf-8"))
+    if room <= 0:
+        return None
+    head = message.content.encode("utf-8")[:room].decode("utf-8", errors="ignore")
+    copy = Message(role=message.role, content=head + marker, cause_by=message.cause_by, sent_from=message.sent_from)
+    copy.timestamp, copy.seq, copy.digest = message.timestamp, message.seq, None
+    copy.size = len(copy.content.encode("utf-8"))
+    return copy
+
+def pack_recent(messages, budget):
+    """Newest messages first, stopping at the first one that does not fit."""
+    kept, used = [], 0
+    for m in reversed(messages):
+        if used + _size(m) > budget:
+            break
+        kept.append(m)
+        used += m.size
+    kept.reverse()
+    return kept
+
+def pack_latest_per_role(messages, budget):
+    """
+    The newest message of every role first (newest roles first), then the
+    remaining messages newest first, up to the first one that does not fit.
+    """
+    latest = {}
+    for m in reversed(messages):
+        latest.setdefault(m.role, m)
+    chosen, used = set(), 0
+    for m in latest.values():
+        if used + _size(m) <= budget:
+            chosen.add(id(m))
+            used += m.size
+    for m in reversed(messages):
+        if id(m) in chosen:
+            continue
+        if used + _size(m) > budget:
+            break
+        chosen.add(id(m))
+        used += m.size
+    return [m for m in messages if id(m) in chosen]
+
+def pack_truncate(messages, budget, keep_bytes=512):
+    """
+    Newest messages whole while they fit; older ones are cut down to their
+    first `keep_bytes` (with a marker) until the budget is spent.
+    """
+    kept, used, whole = [], 0, True
+    for m in reversed(messages):
+        if whole and used + _size(m) <= budget:
+            kept.append(m)
+            used += m.size
+            continue
+        whole = False
+        copy = _truncated(m, min(keep_bytes, budget - used))
+        if copy is None:
+            break
+        kept.append(copy)
+        used += copy.size
+    kept.reverse()
+    return kept
+
+PACKERS = {
+    "recent": pack_recent,
+    "latest_per_role": pack_latest_per_role,
+    "truncate": pack_truncate
+}
+
+class ContextBudget:
+    """
+    Caps the context a role hands to its agent. The limit is given in bytes or
+    in approximate tokens; `strategy` names one of PACKERS or is a callable
+    `(messages, budget_bytes) -> messages`. Packing reads the sizes the pool
+    recorded at publish time and never rescans content it keeps whole.
+    """
+    def __init__(self, max_bytes=None, max_tokens=None, strategy="recent"):
+        if (max_bytes is None) == (max_tokens is None):
+            raise ValueError("ContextBudget needs exactly one of max_bytes or max_tokens")
+        self.max_bytes = max_bytes if max_bytes is not None else max_tokens * BYTES_PER_TOKEN
+        if callable(strategy):
+            self.pack_fn = strategy
+        elif strategy in PACKERS:
+            self.pack_fn = PACKERS[strategy]
+        else:
+            raise ValueError(f"Unknown packing strategy '{strategy}'. Known strategies: {', '.join(sorted(PACKERS))}")
+        self.strategy = strategy
+
+    def pack(self, messages):
+        if sum(_size(m) for m in messages) <= self.max_bytes:
+            return list(messages)
+        return self.pack_fn(messages, self.max_bytes)
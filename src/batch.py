@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import json
+import os
+import re
+import sys
+import time
+import uuid
+
+def read_ideas(stream):
+    """One idea per line; blank lines and `#` comments are skipped."""
+    for line in stream:
+        idea = line.strip()
+        if idea and not idea.startswith("#"):
+            yield idea
+
+def _slug(idea):
+    return re.sub(r"[^a-z0-9]+", "-", idea.lower()).strip("-")[:40] or "idea"
+
+def run_job(index, idea, job_dir, memory_dir):
+    """
+    Runs one idea in a pool worker. The worker chdirs into the job's own directory,
+    so everything the agents write under `workspace/` stays isolated per idea, while
+    memory goes to the shared append-only store. Engine output goes to run.log.
+    """
+    from src.bootstrap import build_engine
+    from src.core.engine.checkpoint import CheckpointStore
+    from src.core.engine.memory_manager import MemoryManager
+
+    started = time.perf_counter()
+    os.makedirs(job_dir, exist_ok=True)
+    os.chdir(job_dir)
+    result = {"index": index, "idea": idea, "workspace": job_dir, "log": os.path.join(job_dir, "run.log")}
+    with open("run.log", "w") as log, redirect_stdout(log):
+        try:
+            sop = build_engine(MemoryManager(memory_dir), checkpoints=CheckpointStore())
+            result["success"] = sop.run(idea)
+            result["run_id"] = sop.run_id
+        except Exception as e:
+            result["success"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+    result["duration"] = round(time.perf_counter() - started, 3)
+    return result
+
+def run_batch(stream, out=None, workers=None, root="workspace/batch", memory_dir="memory"):
+    """
+    Runs every idea read from `stream` across a process pool and writes one JSON
+    line per finished run to `out`, in completion order. Ideas are read lazily and
+    at most twice the worker count are queued at a time. A job that dies with its
+    worker still gets a line, with an "error", and a broken pool is replaced so the
+    rest of the batch keeps going. Returns True if every run succeeded.
+    """
+    out = out or sys.stdout
+    workers = workers or os.cpu_count() or 1
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    batch_dir = os.path.abspath(os.path.join(root, f"{stamp}-{uuid.uuid4().hex[:6]}"))
+    memory_dir = os.path.abspath(memory_dir)
+    all_ok = True
+    pending = {}  # {future: (index, idea, job_dir)}
+
+    def drain(return_when):
+        nonlocal all_ok
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            index, idea, job_dir = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker crashed, or run_job failed before it could report
+                result = {"index": index, "idea": idea, "workspace": job_dir, "success": False, "error": f"{type(e).__name__}: {e}"}
+            all_ok = all_ok and result["success"]
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for index, idea in enumerate(read_ideas(stream)):
+            job_dir = os.path.join(batch_dir, f"{index:05d}-{_slug(idea)}")
+            try:
+                future = pool.submit(run_job, index, idea, job_dir, memory_dir)
+            except BrokenProcessPool:
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=workers)
+                future = pool.submit(run_job, index, idea, job_dir, memory_dir)
+            pending[future] = (index, idea, job_dir)
+            if len(pending) >= workers * 2:
+                drain(FIRST_COMPLETED)
+        while pending:
+            drain(FIRST_COMPLETED)
+    finally:
+        pool.shutdown()
+    return all_ok
@@ -0,0 +1,60 @@
+from src.core.engine.sop_executor import SOPExecutor, Environment
+from src.core.engine.memory_manager import MemoryManager
+from src.core.traceability import TraceabilityMatrix
+import importlib
+import os
+
+WORKFLOW_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "core/sop/workflow.json")
+TRACE_PATH = "workspace/traceability.jsonl"
+SESSIONS_DIR = "workspace/sessions"
+
+# (name, class) of every role, in pipeline order. Classes are given by name and only
+# imported when the role is first needed, so loading the engine imports no agents.
+AGENTS_MODULE = "src.agents.implementations"
+ROLES = [
+    ("Guide", "GuideAgent"),
+    ("Planner", "PlannerAgent"),
+    ("Architect", "ArchitectAgent"),
+    ("Structurer", "StructureAgent"),
+    ("Builder", "BuilderAgent"),
+    ("Tester", "TesterAgent"),
+    ("Shipper", "ShipperAgent"),
+]
+
+def agent_class(class_name):
+    return getattr(importlib.import_module(AGENTS_MODULE), class_name)
+
+def agent_factory(class_name, memory):
+    return lambda: agent_class(class_name)(memory)
+
+def build_environment(memory: MemoryManager):
+    # Register User-Centric Roles; each is built the first time a step needs it
+    env = Environment()
+    for name, class_name in ROLES:
+        env.add_factory(name, agent_factory(class_name, memory))
+    return env
+
+def build_worker(queue, memory: MemoryManager = None):
+    """A Worker hosting the same roster, serving the step jobs an engine built with `queue` dispatches."""
+    from src.core.engine.worker import Worker
+
+    return Worker(queue, build_environment(memory or MemoryManager()))
+
+def build_engine(memory: MemoryManager = None, checkpoints=None, workflow_path=WORKFLOW_PATH, trace: TraceabilityMatrix = None, sessions=None, queue=None, dispatch_timeout=None):
+    """
+    Wires an Environment, the user-centric roles and an SOPExecutor together.
+    Shared by the CLI, batch mode and the UI so they all run the same roster.
+    With `sessions`, every run's messages are also logged durably under that directory.
+    With a work `queue`, steps are dispatched to workers (see `build_worker`); an
+    attempt no worker finishes within `dispatch_timeout` seconds fails.
+    """
+    # 1. Setup Environment
+    from src.core.engine.executor import Executor
+
+    memory = memory or MemoryManager()
+    env = build_environment(memory)
+    executor = Executor()
+    trace = trace if trace is not None else TraceabilityMatrix(TRACE_PATH)
+
+    # 2. Initialize SOP Engine
+    return SOPExecutor(env, executor, memory, workflow_path=workflow_path, checkpoints=checkpoints, trace=trace, sessions=sessions, queue=queue, dispatch_timeout=dispatch_timeout)
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: plain copies only
+    fcntl = None
+
+STATE_FILE = ".artifacts.json"
+FICLONE = 0x40049409  # Linux ioctl: share the source's extents copy-on-write (btrfs, XFS)
+
+
+class ArtifactStore:
+    """
+    Content-addressed storage for generated files.
+
+    Each distinct file body is written once to objects/<digest>, read-only.
+    `write_tree` materializes a {path: content} mapping into a target directory
+    through a temporary name and an atomic rename, skipping files whose
+    content is unchanged since the last write. Every call records a manifest
+    under manifests/, so runs can be diffed without touching file contents.
+
+    Files are materialized as writable copies of their objects, cloned
+    copy-on-write where the filesystem supports it. With `link`, they are
+    hardlinks to the objects instead: no data is copied, but the files are
+    read-only and must be replaced rather than edited in place.
+    """
+    def __init__(self, root="workspace/artifacts", link=False):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifests_dir = os.path.join(root, "manifests")
+        # Directories are created on first write, relative to the working directory at
+        # that time, so a warm agent serving several job directories writes into each
+        self.link = link
+        self.reflink = fcntl is not None and hasattr(fcntl, "ioctl")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest_of(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _tmp(self, path):
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def put(self, data):
+        """Stores `data` (bytes or str) unless an identical object exists; returns its digest."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = self.digest_of(data)
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = self._tmp(path)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            # Objects may be hardlinked into workspaces; read-only keeps in-place edits out of the store
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, path)
+        return digest
+
+    def get(self, digest):
+        with open(self.object_path(digest), "rb") as f:
+            return f.read()
+
+    def _copy(self, source, dest):
+        if self.reflink:
+            try:
+                with open(source, "rb") as src, open(dest, "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                # Cross-device or no clone support: plain copies from now on
+                self.reflink = False
+        shutil.copyfile(source, dest)
+
+    def _materialize(self, digest, dest):
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        tmp = self._tmp(dest)
+        if self.link:
+            try:
+                os.link(self.object_path(digest), tmp)
+            except OSError:
+                # Cross-device or no hardlink support: copy from now on
+                self.link = False
+        if not self.link:
+            self._copy(self.object_path(digest), tmp)
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, dest)
+
+    @staticmethod
+    def _fingerprint(path):
+        st = os.stat(path)
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def _read_json(self, path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_json(self, path, data):
+        tmp = self._tmp(path)
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def write_tree(self, files, target, manifest_id=None, prune=True):
+        """
+        Makes `target` contain `files` ({relative path: content}). Objects are
+        stored first, then only new or changed paths are materialized. With
+        `prune`, files written by an earlier call but absent now are removed.
+        Returns the manifest id and the written, unchanged and removed paths.
+        """
+        for path in files:
+            if os.path.isabs(path) or ".." in path.replace("\\", "/").split("/"):
+                raise ValueError(f"Artifact path '{path}' must stay inside the target directory")
+        digests = {path: self.put(content) for path, content in files.items()}
+        os.makedirs(target, exist_ok=True)
+        with self._lock:
+            state_path = os.path.join(target, STATE_FILE)
+            # {path: [digest, ino, size, mtime_ns]} as of the last write_tree into this target
+            previous = self._read_json(state_path) or {}
+            state, written, unchanged, removed = {}, [], [], []
+            for path, digest in sorted(digests.items()):
+                dest = os.path.join(target, path)
+                recorded = previous.get(path)
+                try:
+                    current = self._fingerprint(dest)
+                except FileNotFoundError:
+                    current = None
+                if recorded and recorded[0] == digest and recorded[1:] == current:
+                    unchanged.append(path)
+                else:
+                    self._materialize(digest, dest)
+                    current = self._fingerprint(dest)
+                    written.append(path)
+                state[path] = [digest] + current
+            if prune:
+                for path in sorted(set(previous) - set(digests)):
+                    try:
+                        os.remove(os.path.join(target, path))
+                        removed.append(path)
+                    except FileNotFoundError:
+                        pass
+            else:
+                state = {**{p: r for p, r in previous.items() if p not in state}, **state}
+            self._write_json(state_path, state)
+
+            os.makedirs(self.manifests_dir, exist_ok=True)
+            manifest_id = manifest_id or f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            self._write_json(self._manifest_path(manifest_id), {
+                "id": manifest_id,
+                "target": os.path.abspath(target),
+                "created": datetime.utcnow().isoformat(),
+                "files": digests,
+            })
+        return {"manifest": manifest_id, "written": written, "unchanged": unchanged, "removed": removed}
+
+    def _manifest_path(self, manifest_id):
+        return os.path.join(self.manifests_dir, f"{manifest_id}.json")
+
+    def load_manifest(self, manifest_id):
+        return self._read_json(self._manifest_path(manifest_id))
+
+    def restore(self, manifest_id, target):
+        """
+        Writes the files of an earlier manifest back into `target`, leaving files
+        that still match alone. False if the manifest or one of its objects is gone.
+        """
+        manifest = self.load_manifest(manifest_id)
+        if manifest is None:
+            return False
+        try:
+            files = {path: self.get(digest) for path, digest in manifest["files"].items()}
+        except FileNotFoundError:
+            return False
+        self.write_tree(files, target, manifest_id=manifest_id)
+        return True
+
+    def diff(self, old_id, new_id):
+        """Paths added, removed and changed between two manifests, compared by digest only."""
+        old = self.load_manifest(old_id)["files"]
+        new = self.load_manifest(new_id)["files"]
+        return {
+            "added": sorted(set(new) - set(old)),
+            "removed": sorted(set(old) - set(new)),
+            "changed": sorted(p for p in set(old) & set(new) if old[p] != new[p]),
+        }
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+
+class CheckpointStore:
+    """
+    Persists validated step outputs so a failed run can be resumed.
+
+    Step records are content-addressed: the key hashes the step definition, the
+    agent bound to it, the upstream messages it observed and any other state the
+    agent reports through `Role.state_key`, so any run whose
+    inputs match (a resume or simply the same idea again) replays the record
+    instead of calling the agent. Run manifests map a run id to its idea and the
+    step keys it completed.
+    """
+    def __init__(self, root="workspace/checkpoints"):
+        self.root = root
+        self.steps_dir = os.path.join(root, "steps")
+        self.runs_dir = os.path.join(root, "runs")
+        os.makedirs(self.steps_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def step_key(step, agent, observed, state=None):
+        # Only the latest message of each upstream role counts: that is the validated
+        # output, while failed attempts before it are not replayed on resume
+        latest = {}
+        for m in observed:
+            latest[m.role] = m
+        payload = {
+            "step": step,
+            "agent": [agent.name, agent.profile, type(agent).__name__],
+            "observed": [[m.role, m.sent_from, m.content] for _, m in sorted(latest.items())],
+            "state": state,
+        }
+        blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def _write(self, path, data):
+        # Write-then-rename so a crash never leaves a truncated checkpoint behind
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def _read(self, path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def load_step(self, key):
+        return self._read(os.path.join(self.steps_dir, f"{key}.json"))
+
+    def save_step(self, key, step_name, output, messages):
+        self._write(os.path.join(self.steps_dir, f"{key}.json"), {
+            "step": step_name,
+            "output": output,
+            "messages": [{"role": m.role, "content": m.content, "cause_by": m.cause_by, "sent_from": m.sent_from} for m in messages],
+            "saved_at": datetime.utcnow().isoformat(),
+        })
+
+    def start_run(self, user_idea, run_id=None):
+        with self._lock:
+            run = self.load_run(run_id) if run_id else None
+            if run is None:
+                run_id = run_id or f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+                run = {"run_id": run_id, "idea": user_idea, "created": datetime.utcnow().isoformat(), "steps": {}}
+            run["status"] = "running"
+            self._write(self._run_path(run_id), run)
+            return run_id
+
+    def record_step(self, run_id, step_name, key, cached):
+        with self._lock:
+            run = self.load_run(run_id)
+            run["steps"][step_name] = {"key": key, "cached": cached}
+            self._write(self._run_path(run_id), run)
+
+    def finish_run(self, run_id, success):
+        with self._lock:
+            run = self.load_run(run_id)
+            run["status"] = "completed" if success else "failed"
+            self._write(self._run_path(run_id), run)
+
+    def load_run(self, run_id):
+        return self._read(self._run_path(run_id))
+
+    def _run_path(self, run_id):
+        return os.path.join(self.runs_dir, f"{run_id}.json")
@@ -1,25 +1,212 @@
-import subprocess
+import asyncio
+import inspect
+import os
+import signal
+import tempfile
+import threading
+import time
+import weakref
+
+from src.core.engine.profiler import profiler
+
+READ_CHUNK = 64 * 1024
+
+
+class CappedOutput:
+    """
+    Collects a process stream. The first `limit` bytes stay in memory; once the
+    stream grows past that, everything is also spilled to a file on disk.
+    """
+    def __init__(self, limit, spill_dir, name):
+        self.limit = limit
+        self.spill_dir = spill_dir
+        self.name = name
+        self.size = 0
+        self.path = None
+        self._head = bytearray()
+        self._file = None
+
+    def write(self, data):
+        self.size += len(data)
+        if self._file is None and self.size > self.limit:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            fd, self.path = tempfile.mkstemp(prefix=f"{self.name}-", suffix=".log", dir=self.spill_dir)
+            self._file = os.fdopen(fd, "wb")
+            self._file.write(self._head)
+        if self._file is not None:
+            self._file.write(data)
+        room = self.limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    @property
+    def truncated(self):
+        return self.path is not None
+
+    def text(self):
+        return self._head.decode("utf-8", errors="replace")
+
 
 class Executor:
-    def execute(self, command, cwd=None):
+    """
+    Runs shell commands as asyncio subprocesses with a bounded concurrency limit,
+    per-command timeouts (killing the whole process group), incremental line
+    streaming and capped output capture.
+
+    `execute` is the blocking entry point used by agents and steps: it runs the
+    command on a private background event loop so concurrent callers from any
+    thread share the same concurrency limit. Code already running in an event
+    loop should await `execute_async` or iterate `stream` instead.
+    """
+    def __init__(self, max_concurrency=4, timeout=None, max_output_bytes=1024 * 1024, spill_dir="workspace/logs/executor"):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.spill_dir = spill_dir
+        self._semaphores = weakref.WeakKeyDictionary()  # {event loop: asyncio.Semaphore}
+        self._loop = None
+        self._loop_guard = threading.Lock()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    def _background_loop(self):
+        with self._loop_guard:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="executor-loop", daemon=True).start()
+            return self._loop
+
+    @staticmethod
+    def _kill(proc):
         try:
-            result = subprocess.run(
-                command,
-                cwd=cwd,
-                capture_output=True,
-                text=True,
-                shell=True
-            )
-            return {
-                "success": result.returncode == 0,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "code": result.returncode
-            }
+            if os.name == "posix":
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    async def _pump(stream, output, name, on_line):
+        pending = b""
+        while True:
+            chunk = await stream.read(READ_CHUNK)
+            if not chunk:
+                break
+            output.write(chunk)
+            if on_line is None:
+                continue
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            if len(pending) > READ_CHUNK:  # Very long line: flush what we have
+                lines.append(pending)
+                pending = b""
+            for line in lines:
+                result = on_line(name, line.decode("utf-8", errors="replace"))
+                if inspect.isawaitable(result):
+                    await result
+        if on_line is not None and pending:
+            result = on_line(name, pending.decode("utf-8", errors="replace"))
+            if inspect.isawaitable(result):
+                await result
+
+    async def execute_async(self, command, cwd=None, timeout=None, on_line=None):
+        """
+        Runs `command` and returns the result dict. `on_line(stream, line)` is called
+        (or awaited) for every stdout/stderr line as it arrives.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        stdout = CappedOutput(self.max_output_bytes, self.spill_dir, "stdout")
+        stderr = CappedOutput(self.max_output_bytes, self.spill_dir, "stderr")
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            async with self._semaphore():
+                proc = await asyncio.create_subprocess_shell(
+                    command,
+                    cwd=cwd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=os.name == "posix"
+                )
+                try:
+                    await asyncio.wait_for(asyncio.gather(
+                        self._pump(proc.stdout, stdout, "stdout", on_line),
+                        self._pump(proc.stderr, stderr, "stderr", on_line),
+                        proc.wait()
+                    ), timeout)
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    self._kill(proc)
+                    await proc.wait()
+                except BaseException:
+                    self._kill(proc)
+                    raise
         except Exception as e:
             return {
                 "success": False,
                 "stdout": "",
                 "stderr": str(e),
-                "code": -1
+                "code": -1,
+                "timed_out": False,
+                "truncated": False,
+                "stdout_path": None,
+                "stderr_path": None,
+                "duration": time.perf_counter() - started
             }
+        finally:
+            stdout.close()
+            stderr.close()
+
+        stderr_text = stderr.text()
+        if timed_out:
+            stderr_text += f"\n[executor] Timed out after {timeout}s; process group killed."
+        return {
+            "success": proc.returncode == 0 and not timed_out,
+            "stdout": stdout.text(),
+            "stderr": stderr_text,
+            "code": proc.returncode,
+            "timed_out": timed_out,
+            "truncated": stdout.truncated or stderr.truncated,
+            "stdout_path": stdout.path,
+            "stderr_path": stderr.path,
+            "duration": time.perf_counter() - started
+        }
+
+    async def stream(self, command, cwd=None, timeout=None):
+        """
+        Async iterator over (stream, line) pairs as the command produces them.
+        The final item is ("exit", result dict).
+        """
+        queue = asyncio.Queue()
+        task = asyncio.create_task(self.execute_async(command, cwd=cwd, timeout=timeout, on_line=lambda name, line: queue.put((name, line))))
+        task.add_done_callback(lambda t: queue.put_nowait(None))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            yield "exit", task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def execute(self, command, cwd=None, timeout=None, on_line=None):
+        with profiler.span(command[:80], "executor") as span:
+            future = asyncio.run_coroutine_threadsafe(
+                self.execute_async(command, cwd=cwd, timeout=timeout, on_line=on_line),
+                self._background_loop()
+            )
+            result = future.result()
+            span.set(code=result["code"], timed_out=result["timed_out"])
+            return result
@@ -1,50 +1,206 @@
+import atexit
 import logging
+import logging.handlers
 import json
 import os
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timezone
+
+# Extra attributes `log_event` attaches to records; emitted as top-level JSON fields
+STRUCTURED_FIELDS = ("role", "action", "status", "step", "attempt", "duration")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        log_record = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_record[field] = value
+        return json.dumps(log_record)
+
+class BatchingJsonFileHandler(logging.Handler):
+    """
+    Writes formatted records in batches to `<prefix>_<YYYYMMDD>.json`. A new file is
+    started when the date changes, and the current one is rotated to `.1`, `.2`, ...
+    once it would exceed `max_bytes`. The file is only opened on the first write.
+    """
+    def __init__(self, directory="workspace/logs", prefix="ade", max_bytes=10 * 1024 * 1024, backup_count=5, batch_size=100):
+        super().__init__()
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self._buffer = []
+        self._stream = None
+        self._date = None
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.prefix}_{self._date}.json")
+
+    def emit(self, record):
+        try:
+            self._buffer.append(self.format(record))
+            if len(self._buffer) >= self.batch_size:
+                self._write_batch()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_batch()
+        finally:
+            self.release()
+
+    def _write_batch(self):
+        if not self._buffer:
+            return
+        data = "\n".join(self._buffer) + "\n"
+        self._buffer.clear()
+        today = datetime.now().strftime("%Y%m%d")
+        if self._stream is None or today != self._date:
+            self._open(today)
+        elif self.max_bytes and self._stream.tell() and self._stream.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._stream.write(data)
+        self._stream.flush()
+
+    def _open(self, date):
+        if self._stream is not None:
+            self._stream.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self._date = date
+        self._stream = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self):
+        self._stream.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._stream = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        self.acquire()
+        try:
+            self._write_batch()
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+class EnqueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler without the per-record copy and full format of the default
+    prepare(): arguments are merged and tracebacks rendered, nothing more.
+    """
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle."""
+    def __init__(self, queue, *handlers, flush_interval=1.0):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self.running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            super().stop()
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
 
 class EnterpriseLogger:
-    def __init__(self, name="AutoDevEnterprise"):
+    """
+    Logging front end whose hot path only enqueues records. Formatting, console
+    output and batched JSON file writes happen on a background QueueListener.
+    """
+    def __init__(self, name="AutoDevEnterprise", log_dir="workspace/logs", max_bytes=10 * 1024 * 1024, backup_count=5, batch_size=100, flush_interval=1.0):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
-        
+        self.listener = None
+
         # Create handlers if they don't exist
         if not self.logger.handlers:
             # Console Handler
             c_handler = logging.StreamHandler()
             c_handler.setLevel(logging.INFO)
-            
+
             # File Handler (JSON Format for Splunk/ELK)
-            os.makedirs("workspace/logs", exist_ok=True)
-            f_handler = logging.FileHandler(f"workspace/logs/ade_{datetime.now().strftime('%Y%m%d')}.json")
+            f_handler = BatchingJsonFileHandler(log_dir, max_bytes=max_bytes, backup_count=backup_count, batch_size=batch_size)
             f_handler.setLevel(logging.DEBUG)
-
-            # JSON Formatter
-            class JsonFormatter(logging.Formatter):
-                def format(self, record):
-                    log_record = {
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "level": record.levelname,
-                        "module": record.module,
-                        "message": record.getMessage(),
-                        "thread": record.threadName
-                    }
-                    return json.dumps(log_record)
-
             f_handler.setFormatter(JsonFormatter())
-            
+
             # Standard Console Formatter
             c_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             c_handler.setFormatter(c_format)
 
-            self.logger.addHandler(c_handler)
-            self.logger.addHandler(f_handler)
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(EnqueueHandler(log_queue))
+            self.listener = BatchingQueueListener(log_queue, c_handler, f_handler, flush_interval=flush_interval)
+            self.listener.start()
+            atexit.register(self.close)
 
-    def log_event(self, role, action, status, details=None):
-        self.logger.info(f"[{role}] {action} - {status} | {details or ''}")
+    def log_event(self, role, action, status, details=None, step=None, attempt=None, duration=None):
+        self.logger.info(f"[{role}] {action} - {status} | {details or ''}", extra={
+            "role": role,
+            "action": action,
+            "status": status,
+            "step": step,
+            "attempt": attempt,
+            "duration": duration
+        })
 
     def error(self, message):
         self.logger.error(message)
 
-# Singleton instance
-ade_logger = EnterpriseLogger().logger
+    def close(self):
+        """Drain the queue and flush every handler."""
+        if self.listener is not None and self.listener.running:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+
+_default = None
+_default_lock = threading.Lock()
+
+def __getattr__(name):
+    # The shared `ade_logger` is built on first access rather than at import,
+    # so importing this module starts no thread and touches no files
+    global _default
+    if name == "ade_logger":
+        with _default_lock:
+            if _default is None:
+                _default = EnterpriseLogger().logger
+        return _default
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,42 +1,195 @@
+import hashlib
+import heapq
 import json
 import os
+import pickle
+import threading
+
+from src.core.engine.recall_index import InvertedIndex, record_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND writes only
+    fcntl = None
+
+# Records a recall index must have gained since it was last written before it is written again
+PERSIST_AFTER = 1000
 
 class MemoryManager:
+    """
+    Append-only JSON Lines memory. Each add is a single locked append; reads go
+    through an in-process cache that only parses what other writers appended
+    since the last look (detected from the file's size and mtime). `recall` also
+    keeps an inverted index per kind, built on the first recall and extended with
+    new records after that; counting and loading never tokenize anything.
+
+    Indexes are saved next to their file (<kind>.index) once they have grown by
+    PERSIST_AFTER records, so a new process loads the index and only indexes
+    what was appended after it was saved.
+    """
     def __init__(self, memory_dir="memory"):
         self.memory_dir = memory_dir
         self.files = {
-            "feedback": "agent_feedback.json",
-            "failures": "past_failures.json",
-            "patterns": "architecture_patterns.json"
+            "feedback": "agent_feedback.jsonl",
+            "failures": "past_failures.jsonl",
+            "patterns": "architecture_patterns.jsonl"
         }
         os.makedirs(memory_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._cache = {key: self._empty_cache() for key in self.files}
+        for key in self.files:
+            self._migrate_legacy(key)
+
+    @staticmethod
+    def _empty_cache():
+        # "pending" holds raw lines not parsed into "records" yet
+        # "saved" is how many records the index on disk covers
+        return {"records": [], "pending": [], "offset": 0, "stat": None, "index": None, "saved": 0}
+
+    def _path(self, key):
+        return os.path.join(self.memory_dir, self.files[key])
+
+    def _migrate_legacy(self, key):
+        # Earlier versions stored each kind as one pretty-printed JSON array
+        legacy = self._path(key)[:-len(".jsonl")] + ".json"
+        if os.path.exists(self._path(key)) or not os.path.exists(legacy):
+            return
+        with open(legacy, "r") as f:
+            records = json.load(f)
+        tmp = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+        os.replace(tmp, self._path(key))
+
+    def _refresh(self, key):
+        """Bring the cache for `key` up to date with the file on disk."""
+        cache = self._cache[key]
+        try:
+            st = os.stat(self._path(key))
+        except FileNotFoundError:
+            cache.update(self._empty_cache())
+            return cache
+        stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if stat == cache["stat"]:
+            return cache
+        if cache["stat"] is None or st.st_ino != cache["stat"][0] or st.st_size < cache["offset"]:
+            # Replaced or truncated: start over
+            cache.update(self._empty_cache())
+        with open(self._path(key), "rb") as f:
+            f.seek(cache["offset"])
+            chunk = f.read(st.st_size - cache["offset"])
+        # A concurrent writer may be mid-line; only consume complete lines
+        end = chunk.rfind(b"\n") + 1
+        cache["pending"].extend(line for line in chunk[:end].splitlines() if line.strip())
+        cache["offset"] += end
+        # Keep the inode but force another read if a partial line was left behind
+        cache["stat"] = stat if end == len(chunk) else (st.st_ino, None, None)
+        return cache
+
+    def _parsed(self, key):
+        """The cache for `key` with every line read so far parsed into records."""
+        cache = self._refresh(key)
+        if cache["pending"]:
+            # One parse of the whole batch is several times faster than one per line
+            cache["records"].extend(json.loads(b"[" + b",".join(cache["pending"]) + b"]"))
+            cache["pending"] = []
+        return cache
+
+    def _index_path(self, key):
+        return self._path(key)[:-len(".jsonl")] + ".index"
+
+    def _tail(self, key, offset):
+        # The last bytes an index covers; a file rewritten since it was saved will not match
+        start = max(0, offset - 4096)
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def _load_index(self, key, cache):
+        """The saved index for `key` if it still matches the start of the file, else None."""
+        try:
+            with open(self._index_path(key), "rb") as f:
+                header = pickle.load(f)
+                if header["offset"] > cache["offset"] or header["count"] > len(cache["records"]):
+                    return None
+                if header["tail"] != self._tail(key, header["offset"]):
+                    return None
+                index = InvertedIndex.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, ValueError):
+            return None
+        return index if len(index) == header["count"] else None
+
+    def _save_index(self, key, cache):
+        path = self._index_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        header = {"offset": cache["offset"], "count": len(cache["index"]), "tail": self._tail(key, cache["offset"])}
+        with open(tmp, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            cache["index"].dump(f)
+        os.replace(tmp, path)
+
+    def _indexed(self, key):
+        """The cache for `key` with its recall index caught up with its records."""
+        cache = self._parsed(key)
+        index = cache["index"]
+        if index is None:
+            index = cache["index"] = self._load_index(key, cache) or InvertedIndex()
+            cache["saved"] = len(index)
+        records = cache["records"]
+        for doc_id in range(len(index), len(records)):
+            index.add(doc_id, record_text(records[doc_id]))
+        if len(index) - cache["saved"] >= PERSIST_AFTER:
+            self._save_index(key, cache)
+            cache["saved"] = len(index)
+        return cache
 
     def _load(self, key):
-        path = os.path.join(self.memory_dir, self.files[key])
-        if os.path.exists(path):
-            with open(path, "r") as f:
-                return json.load(f)
-        return []
+        with self._lock:
+            return list(self._parsed(key)["records"])
 
-    def _save(self, key, data):
-        path = os.path.join(self.memory_dir, self.files[key])
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+    def _append(self, key, record):
+        data = (json.dumps(record) + "\n").encode("utf-8")
+        fd = os.open(self._path(key), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
 
     def add_failure(self, failure):
-        failures = self._load("failures")
-        failures.append(failure)
-        self._save("failures", failures)
+        self._append("failures", failure)
 
     def add_pattern(self, pattern):
-        patterns = self._load("patterns")
-        patterns.append(pattern)
-        self._save("patterns", patterns)
+        self._append("patterns", pattern)
 
     def add_feedback(self, feedback):
-        feedbacks = self._load("feedback")
-        feedbacks.append(feedback)
-        self._save("feedback", feedbacks)
+        self._append("feedback", feedback)
+
+    def count(self, key):
+        with self._lock:
+            cache = self._refresh(key)
+            return len(cache["records"]) + len(cache["pending"])
+
+    def counts(self):
+        return {key: self.count(key) for key in self.files}
+
+    def recall(self, query, kind=None, k=5):
+        """
+        Returns the k records most relevant to `query`, best first. `kind` limits
+        the search to "failures", "patterns" or "feedback".
+        """
+        kinds = [kind] if kind else list(self.files)
+        hits = []
+        with self._lock:
+            for key in kinds:
+                cache = self._indexed(key)
+                hits.extend((score, key, doc_id) for score, doc_id in cache["index"].search(query, k))
+            return [self._cache[key]["records"][doc_id] for _, key, doc_id in heapq.nlargest(k, hits)]
 
     def get_all_memory(self):
         return {
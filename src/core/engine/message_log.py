@@ -0,0 +1,235 @@
+import bisect
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+
+from src.core.engine.message_pool import Message
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+FRAME = struct.Struct("<II")            # body length, crc32(body)
+HEADER = struct.Struct("<QdHHHI16s")    # seq, timestamp, role/cause_by/sent_from/content lengths, digest
+OFFSET = struct.Struct("<Q")
+
+
+class _Segment:
+    """One `<first seq>.log` file of length-prefixed records and its `.idx` of record offsets."""
+    __slots__ = ("first_seq", "log_path", "idx_path", "offsets", "size", "_map", "_map_size")
+
+    def __init__(self, directory, first_seq):
+        self.first_seq = first_seq
+        self.log_path = os.path.join(directory, f"{first_seq:020d}.log")
+        self.idx_path = os.path.join(directory, f"{first_seq:020d}.idx")
+        self.offsets = array("Q")
+        self.size = 0
+        self._map = None
+        self._map_size = 0
+
+    def view(self, end):
+        """A read-only memoryview of the log covering at least `end` bytes, remapped as the segment grows."""
+        if self._map is None or self._map_size < end:
+            # A replaced map is closed once the views handed out over it are released
+            with open(self.log_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_size = len(self._map)
+        return memoryview(self._map)
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:  # a caller still holds a content view; the map closes with it
+                pass
+            self._map = None
+
+
+class MessageLog:
+    """
+    Durable, append-only message log. Messages are written to segment files as
+    length-prefixed, checksummed records, and each record's offset goes to the
+    segment's index file, so message `seq` is found with one bisect over
+    segments and one index lookup. Reads go through read-only memory maps:
+    `content` returns a zero-copy view of a message body, and `read` decodes a
+    single message without loading the rest of the log.
+
+    Reopening a log recovers from a crash mid-append: the index is rebuilt from
+    any complete records past its end and a torn trailing record is cut off.
+    A `read_only` log never writes: it only sees the complete records and
+    leaves repairs to the next writer, so it is safe to open while a run is
+    still appending.
+    """
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, sync=False, read_only=False):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.sync = sync
+        self.read_only = read_only
+        self._segments = []
+        self._lock = threading.Lock()
+        self._log_fd = None
+        self._idx_fd = None
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".log"))
+        for name in names:
+            segment = _Segment(directory, int(name[:-len(".log")]))
+            self._load_index(segment)
+            self._segments.append(segment)
+        if self._segments:
+            last = self._segments[-1]
+            if read_only:
+                offsets, last.size = self._scan(last)
+                last.offsets = array("Q", offsets)
+            else:
+                self._recover(last)
+
+    @staticmethod
+    def _load_index(segment):
+        try:
+            with open(segment.idx_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        segment.offsets.frombytes(data[:len(data) - len(data) % OFFSET.size])
+        segment.size = os.path.getsize(segment.log_path)
+
+    @staticmethod
+    def _record_end(data, position):
+        """End of the intact record at `position` in `data`, or None if it is torn or corrupt."""
+        if position + FRAME.size > len(data):
+            return None
+        length, crc = FRAME.unpack_from(data, position)
+        end = position + FRAME.size + length
+        if end > len(data) or zlib.crc32(data[position + FRAME.size:end]) != crc:
+            return None
+        return end
+
+    def _scan(self, segment):
+        """Offsets of the segment's intact records and the end of the last one, indexed or not."""
+        offsets = list(segment.offsets)
+        with open(segment.log_path, "rb") as f:
+            while True:
+                # Trust the index up to its last entry whose record is intact
+                start = offsets[-1] if offsets else 0
+                f.seek(start)
+                tail = f.read()
+                end = self._record_end(tail, 0)
+                if not offsets or end is not None:
+                    break
+                offsets.pop()
+        position = end if offsets else 0
+        while True:
+            nxt = self._record_end(tail, position)
+            if nxt is None:
+                break
+            offsets.append(start + position)
+            position = nxt
+        return offsets, start + position
+
+    def _recover(self, segment):
+        """Re-indexes complete records past the index's end and truncates a torn trailing record."""
+        offsets, size = self._scan(segment)
+        if size != segment.size:
+            os.truncate(segment.log_path, size)
+        if offsets != list(segment.offsets):
+            segment.offsets = array("Q", offsets)
+            with open(segment.idx_path, "wb") as f:
+                f.write(segment.offsets.tobytes())
+        segment.size = size
+
+    def __len__(self):
+        if not self._segments:
+            return 0
+        last = self._segments[-1]
+        return last.first_seq + len(last.offsets)
+
+    def _open_active(self, first_seq):
+        self._close_fds()
+        segment = _Segment(self.directory, first_seq)
+        self._segments.append(segment)
+        return segment
+
+    def _close_fds(self):
+        for fd in (self._log_fd, self._idx_fd):
+            if fd is not None:
+                os.close(fd)
+        self._log_fd = self._idx_fd = None
+
+    @staticmethod
+    def _encode(message):
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        role, cause_by, sent_from, body = (s.encode("utf-8") for s in (message.role, message.cause_by, message.sent_from, content))
+        digest = bytes.fromhex(message.digest) if message.digest else bytes(16)
+        header = HEADER.pack(message.seq, message.timestamp, len(role), len(cause_by), len(sent_from), len(body), digest)
+        return b"".join((header, role, cause_by, sent_from, body))
+
+    def append(self, message: Message):
+        """Appends a published message; its seq must be the next one in the log."""
+        if self.read_only:
+            raise ValueError(f"Message log {self.directory} is read-only")
+        with self._lock:
+            if message.seq != len(self):
+                raise ValueError(f"Message seq {message.seq} does not follow the log (expected {len(self)})")
+            segment = self._segments[-1] if self._segments else None
+            if segment is None or segment.size >= self.segment_bytes:
+                segment = self._open_active(message.seq)
+            if self._log_fd is None:
+                self._log_fd = os.open(segment.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self._idx_fd = os.open(segment.idx_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            body = self._encode(message)
+            record = FRAME.pack(len(body), zlib.crc32(body)) + body
+            view = memoryview(record)
+            while view:
+                view = view[os.write(self._log_fd, view):]
+            # The index entry goes after the record, so a crash never indexes a missing record
+            os.write(self._idx_fd, OFFSET.pack(segment.size))
+            if self.sync:
+                os.fsync(self._log_fd)
+            segment.offsets.append(segment.size)
+            segment.size += len(record)
+
+    def _locate(self, seq):
+        if not 0 <= seq < len(self):
+            raise IndexError(f"seq {seq} is not in the log")
+        segment = self._segments[bisect.bisect_right(self._segments, seq, key=lambda s: s.first_seq) - 1]
+        offset = segment.offsets[seq - segment.first_seq]
+        length = FRAME.unpack_from(segment.view(offset + FRAME.size), offset)[0]
+        start = offset + FRAME.size
+        return segment.view(start + length), start
+
+    def _fields(self, seq):
+        view, start = self._locate(seq)
+        seq_, timestamp, n_role, n_cause, n_sender, n_content, digest = HEADER.unpack_from(view, start)
+        position = start + HEADER.size
+        strings = []
+        for n in (n_role, n_cause, n_sender):
+            strings.append(str(view[position:position + n], "utf-8"))
+            position += n
+        return strings, timestamp, digest, view, position, n_content
+
+    def header(self, seq):
+        """Role, sender and size of one message, without decoding its content."""
+        (role, cause_by, sent_from), timestamp, digest, _, _, size = self._fields(seq)
+        return {"seq": seq, "role": role, "cause_by": cause_by, "sent_from": sent_from, "timestamp": timestamp, "digest": digest.hex() if any(digest) else None, "size": size}
+
+    def content(self, seq):
+        """Zero-copy view of one message's UTF-8 content."""
+        _, _, _, view, position, size = self._fields(seq)
+        return view[position:position + size]
+
+    def read(self, seq):
+        """Decodes one message."""
+        (role, cause_by, sent_from), timestamp, digest, view, position, size = self._fields(seq)
+        message = Message(role=role, content=str(view[position:position + size], "utf-8"), cause_by=cause_by, sent_from=sent_from)
+        message.timestamp, message.seq, message.digest, message.size = timestamp, seq, digest.hex() if any(digest) else None, size
+        return message
+
+    def __iter__(self):
+        return (self.read(seq) for seq in range(len(self)))
+
+    def close(self):
+        with self._lock:
+            self._close_fds()
+            for segment in self._segments:
+                segment.close()
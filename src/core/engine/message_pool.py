@@ -1,29 +1,190 @@
+import bisect
+import hashlib
+import heapq
+import itertools
+import sys
+import threading
+import time
+
 class Message:
+    # Slotted and with interned role/sender names: pools hold many small messages
+    __slots__ = ("role", "content", "cause_by", "sent_from", "timestamp", "seq", "digest", "size")
+
     def __init__(self, role, content, cause_by="", sent_from=""):
-        self.role = role
+        self.role = sys.intern(role)
         self.content = content
-        self.cause_by = cause_by
-        self.sent_from = sent_from
+        self.cause_by = sys.intern(cause_by)
+        self.sent_from = sys.intern(sent_from)
+        self.timestamp = time.time()
+        self.seq = None  # Assigned by the pool on publish
+        self.digest = None  # Content digest, assigned by the pool on publish
+        self.size = None  # UTF-8 content bytes, assigned by the pool on publish
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
 
-class MessagePool:
+class ContentStore:
+    """
+    Deduplicating content storage keyed by digest. Messages with identical bodies
+    (e.g. the same template rendered on every retry) share one string object.
+    """
     def __init__(self):
+        self._blobs = {}  # {digest: content}
+        self._sizes = {}  # {digest: UTF-8 bytes}
+        self.unique_bytes = 0
+
+    @staticmethod
+    def digest_of(content):
+        """Digest of a str (hashed as UTF-8) or of bytes."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def intern(self, content):
+        """Returns (digest, canonical content, UTF-8 size)."""
+        data = content.encode("utf-8")
+        digest = self.digest_of(data)
+        canonical = self._blobs.get(digest)
+        if canonical is None:
+            canonical = self._blobs[digest] = content
+            self._sizes[digest] = len(data)
+            self.unique_bytes += sys.getsizeof(content)
+        return digest, canonical, self._sizes[digest]
+
+    def get(self, digest):
+        return self._blobs.get(digest)
+
+    def __len__(self):
+        return len(self._blobs)
+
+class MessagePool:
+    """
+    In-memory message bus with per-role indexes. With a `log` (a MessageLog),
+    every publish is also appended to disk, and messages already in the log are
+    loaded back first, so a session survives a crash and continues where it stopped.
+    """
+    def __init__(self, log=None):
         self.messages = []
+        # Steps may publish from scheduler worker threads
+        self._lock = threading.Lock()
+        self._by_role = {}  # {role: [messages in publish order]}
+        self._latest = {}   # {role: most recent message}
+        self.store = ContentStore()
+        self._logical_bytes = 0
+        self._listeners = []
+        self.log = log
+        for message in log or ():
+            self._index(message)
+        self._seq = itertools.count(len(self.messages))
 
-    def publish(self, message: Message):
+    def _index(self, message):
+        if isinstance(message.content, str):
+            message.digest, message.content, message.size = self.store.intern(message.content)
+            self._logical_bytes += sys.getsizeof(message.content)
+        else:
+            message.size = len(str(message.content).encode("utf-8"))
         self.messages.append(message)
+        self._by_role.setdefault(message.role, []).append(message)
+        self._latest[message.role] = message
+
+    def publish(self, message: Message):
+        with self._lock:
+            message.seq = next(self._seq)
+            self._index(message)
+            if self.log is not None:
+                self.log.append(message)
+        for listener in self._listeners:
+            listener(message)
 
-    def fetch(self, subscriber_role=None):
+    def add_listener(self, callback):
+        """`callback(message)` is called after every publish, outside the pool lock."""
+        self._listeners.append(callback)
+
+    @staticmethod
+    def _roles_of(subscriber):
+        # Accepts a Role (anything with a `subscription`), a single role name or an iterable of names
+        if hasattr(subscriber, "subscription"):
+            return subscriber.subscription
+        if isinstance(subscriber, str):
+            return (subscriber,)
+        return subscriber
+
+    def fetch(self, subscriber_role=None, since=None):
         """
-        In a real publish-subscribe system, we'd filter based on subscriptions.
-        For now, we return all messages or filter by role if needed.
+        Returns every message, or only those whose role the subscriber listens to.
+        Subscribed messages come from the per-role indexes, merged back into publish order.
+        With `since`, only messages whose seq is greater than it are returned.
         """
-        return self.messages
+        if subscriber_role is None:
+            if since is None:
+                return self.messages
+            with self._lock:
+                return self.messages[since + 1:]  # seq doubles as the position in `messages`
+        with self._lock:
+            streams = []
+            for r in self._roles_of(subscriber_role):
+                msgs = self._by_role.get(r)
+                if not msgs:
+                    continue
+                start = 0 if since is None else bisect.bisect_right(msgs, since, key=lambda m: m.seq)
+                if start < len(msgs):
+                    streams.append(msgs[start:])
+        if not streams:
+            return []
+        if len(streams) == 1:
+            return streams[0]
+        return list(heapq.merge(*streams, key=lambda m: m.seq))
 
     def find_latest(self, role):
-        for msg in reversed(self.messages):
-            if msg.role == role:
-                return msg
-        return None
+        return self._latest.get(role)
+
+    def memory_usage(self):
+        """Approximate bytes held by this pool, before and after content deduplication."""
+        with self._lock:
+            message_bytes = sum(sys.getsizeof(m) for m in self.messages)
+            return {
+                "messages": len(self.messages),
+                "unique_contents": len(self.store),
+                "message_bytes": message_bytes,
+                "content_bytes": self.store.unique_bytes,
+                "logical_content_bytes": self._logical_bytes,
+                "total_bytes": message_bytes + self.store.unique_bytes + sys.getsizeof(self.messages),
+            }
+
+    def __len__(self):
+        return len(self.messages)
+
+class StagingPool:
+    """
+    Write buffer over a MessagePool for one speculative attempt. Reads go to the
+    underlying pool; publishes are held back until `commit` publishes them for
+    real, or dropped by `discard`. Publishes after either are ignored.
+    """
+    def __init__(self, pool: MessagePool):
+        self.pool = pool
+        self.staged = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def publish(self, message: Message):
+        with self._lock:
+            if not self.closed:
+                self.staged.append(message)
+
+    def commit(self):
+        """Publishes the staged messages to the underlying pool, in order, and returns them."""
+        with self._lock:
+            staged, self.staged, self.closed = self.staged, [], True
+        for message in staged:
+            self.pool.publish(message)
+        return staged
+
+    def discard(self):
+        with self._lock:
+            self.staged, self.closed = [], True
+
+    def __getattr__(self, name):
+        # fetch, find_latest, messages, ... come from the real pool
+        return getattr(self.pool, name)
+
+    def __len__(self):
+        return len(self.pool)
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+class _NullSpan:
+    """Returned while profiling is off, so instrumented code pays one attribute check."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    __slots__ = ("profiler", "name", "category", "args", "tid", "start", "end", "cpu_start", "cpu", "mem_start", "peak")
+
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+        self.mem_start = 0
+        self.peak = 0
+
+    def set(self, **fields):
+        """Attach counters (attempts, bytes published, ...) to the span."""
+        self.args.update(fields)
+
+    def __enter__(self):
+        self.tid = threading.get_ident()
+        if self.profiler.trace_memory:
+            self.profiler._push(self)
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        self.cpu = time.thread_time() - self.cpu_start
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if self.profiler.trace_memory:
+            self.profiler._pop(self)
+        self.profiler._record(self)
+        return False
+
+class Profiler:
+    """
+    Records wall time, CPU time (of the calling thread) and, optionally, peak
+    traced memory above the level at entry for nested spans. Spans are exported
+    as a Chrome trace-event file (chrome://tracing, Perfetto) or aggregated into
+    a summary table.
+
+    Peak memory comes from tracemalloc, which is process-wide: when spans on
+    different threads overlap, their peaks include each other's allocations.
+    """
+    def __init__(self, enabled=False, trace_memory=False):
+        self.enabled = False
+        self.trace_memory = False
+        self.spans = []
+        self._lock = threading.Lock()
+        self._stacks = threading.local()
+        self._origin = time.perf_counter()
+        if enabled:
+            self.enable(trace_memory)
+
+    def enable(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+
+    def span(self, name, category="step", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, args)
+
+    def _push(self, span):
+        stack = self._stacks.__dict__.setdefault("spans", [])
+        if stack:
+            # Credit the peak so far to the enclosing span before resetting it
+            stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        span.mem_start = tracemalloc.get_traced_memory()[0]
+        stack.append(span)
+
+    def _pop(self, span):
+        stack = self._stacks.spans
+        span.peak = max(span.peak, tracemalloc.get_traced_memory()[1])
+        stack.pop()
+        if stack:
+            stack[-1].peak = max(stack[-1].peak, span.peak)
+
+    def _record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for s in spans:
+            args = dict(s.args, cpu_ms=round(s.cpu * 1000, 3))
+            if s.peak:
+                args["peak_kb"] = round((s.peak - s.mem_start) / 1024, 1)
+            events.append({
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": round((s.start - self._origin) * 1e6, 1),
+                "dur": round((s.end - s.start) * 1e6, 1),
+                "pid": pid,
+                "tid": s.tid,
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def summary(self):
+        """One row per (category, name): call count and wall/CPU/peak/attempt/byte totals."""
+        rows = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            row = rows.setdefault((s.category, s.name), {
+                "category": s.category, "name": s.name, "calls": 0, "wall_ms": 0.0, "max_ms": 0.0,
+                "cpu_ms": 0.0, "peak_kb": 0.0, "attempts": 0, "bytes": 0
+            })
+            wall = (s.end - s.start) * 1000
+            row["calls"] += 1
+            row["wall_ms"] += wall
+            row["max_ms"] = max(row["max_ms"], wall)
+            row["cpu_ms"] += s.cpu * 1000
+            row["peak_kb"] = max(row["peak_kb"], (s.peak - s.mem_start) / 1024 if s.peak else 0.0)
+            row["attempts"] += s.args.get("attempts", 0)
+            row["bytes"] += s.args.get("bytes_published", 0)
+        return sorted(rows.values(), key=lambda r: r["wall_ms"], reverse=True)
+
+    def format_summary(self):
+        header = f"{'category':<10} {'name':<32} {'calls':>5} {'wall ms':>10} {'max ms':>9} {'cpu ms':>9} {'peak KB':>9} {'tries':>5} {'bytes':>9}"
+        lines = [header, "-" * len(header)]
+        for r in self.summary():
+            lines.append(
+                f"{r['category']:<10} {r['name'][:32]:<32} {r['calls']:>5} {r['wall_ms']:>10.2f} {r['max_ms']:>9.2f} "
+                f"{r['cpu_ms']:>9.2f} {r['peak_kb']:>9.1f} {r['attempts']:>5} {r['bytes']:>9}"
+            )
+        return "\n".join(lines)
+
+# Process-wide profiler; off unless AUTODEV_PROFILE=1 or enabled explicitly (e.g. `--profile`)
+profiler = Profiler(enabled=os.environ.get("AUTODEV_PROFILE") == "1")
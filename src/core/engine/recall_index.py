@@ -0,0 +1,229 @@
+import bisect
+import heapq
+import math
+import pickle
+import re
+from array import array
+from collections import Counter
+
+TOKEN = re.compile(r"[a-z0-9_]{2,}")
+
+
+def record_text(record):
+    """Flattens a memory record (string, dict or list) into searchable text."""
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        return " ".join(f"{k} {record_text(v)}" for k, v in record.items())
+    if isinstance(record, (list, tuple)):
+        return " ".join(record_text(v) for v in record)
+    return "" if record is None else str(record)
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class _Postings:
+    """
+    One term's postings, twice: in doc-id order for random access, and grouped
+    by (tf, document length). Every document in a group has the same BM25
+    weight for the term, so walking groups by weight visits postings best first.
+    """
+    __slots__ = ("docs", "tfs", "groups", "ranked")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.tfs = array("I")
+        self.groups = {}    # {(tf, length): array of doc ids, oldest first}
+        self.ranked = None  # (index size, total length, [(weight, doc ids)] best first, idf) of the last query
+
+    def tf(self, doc_id):
+        i = bisect.bisect_left(self.docs, doc_id)
+        return self.tfs[i] if i < len(self.docs) and self.docs[i] == doc_id else 0
+
+
+class _Cursor:
+    """Walks one term's postings in descending weight, newest document first on ties."""
+    __slots__ = ("ranked", "group", "position")
+
+    def __init__(self, ranked):
+        self.ranked = ranked
+        self.group = 0
+        self.position = len(ranked[0][1]) - 1
+
+    def peek(self):
+        """(weight, doc id) of the next posting, or None when exhausted."""
+        if self.group == len(self.ranked):
+            return None
+        weight, docs = self.ranked[self.group]
+        return weight, docs[self.position]
+
+    def advance(self):
+        self.position -= 1
+        if self.position < 0:
+            self.group += 1
+            if self.group < len(self.ranked):
+                self.position = len(self.ranked[self.group][1]) - 1
+
+
+class InvertedIndex:
+    """
+    Incremental BM25 index over integer document ids. Documents are only ever
+    appended, which matches the append-only memory files it is built from.
+
+    Searches are exact but pruned (Fagin's threshold algorithm): each query
+    term's postings are read best weight first, every document met is scored in
+    full by random access, and the search stops as soon as no unread document
+    can reach the top k. Common query terms therefore do not mean scoring every
+    posting.
+
+    `dump` writes the index as a few flat arrays; an index read back with
+    `load` only rebuilds a term's postings once a query or a new document
+    needs it, so loading does not cost one object per term.
+    """
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # {term: _Postings}
+        self.doc_lengths = array("I")
+        self.total_length = 0
+        # Postings read by `load` and not needed yet: {term: (start, end)} into the two arrays
+        self._frozen = {}
+        self._frozen_docs = array("I")
+        self._frozen_tfs = array("I")
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, doc_id, text):
+        if doc_id != len(self.doc_lengths):
+            raise ValueError(f"Documents must be added in order (expected id {len(self.doc_lengths)}, got {doc_id})")
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        all_postings = self.postings
+        frozen = self._frozen
+        for term, tf in counts.items():
+            postings = all_postings.get(term)
+            if postings is None:
+                postings = all_postings[term] = self._thaw(term) if term in frozen else _Postings()
+            # _Postings.add, inlined: this loop runs once per posting when an index is built
+            postings.docs.append(doc_id)
+            postings.tfs.append(tf)
+            group = postings.groups.get((tf, length))
+            if group is None:
+                group = postings.groups[(tf, length)] = array("I")
+            group.append(doc_id)
+        self.doc_lengths.append(length)
+        self.total_length += length
+
+    def _thaw(self, term):
+        """Rebuilds the postings of a term read by `load`."""
+        start, end = self._frozen.pop(term)
+        postings = _Postings()
+        postings.docs = self._frozen_docs[start:end]
+        postings.tfs = self._frozen_tfs[start:end]
+        lengths = self.doc_lengths
+        for doc_id, tf in zip(postings.docs, postings.tfs):
+            group = postings.groups.get((tf, lengths[doc_id]))
+            if group is None:
+                group = postings.groups[(tf, lengths[doc_id])] = array("I")
+            group.append(doc_id)
+        return postings
+
+    def _postings(self, term):
+        postings = self.postings.get(term)
+        if postings is None and term in self._frozen:
+            postings = self.postings[term] = self._thaw(term)
+        return postings
+
+    def dump(self, f):
+        """Writes the index to the binary file `f`."""
+        terms, docs, tfs = {}, array("I"), array("I")
+        for term, (start, end) in self._frozen.items():
+            terms[term] = (len(docs), len(docs) + end - start)
+            docs.extend(self._frozen_docs[start:end])
+            tfs.extend(self._frozen_tfs[start:end])
+        for term, postings in self.postings.items():
+            terms[term] = (len(docs), len(docs) + len(postings.docs))
+            docs.extend(postings.docs)
+            tfs.extend(postings.tfs)
+        state = (self.k1, self.b, self.total_length, self.doc_lengths.tobytes(), docs.tobytes(), tfs.tobytes(), terms)
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, f):
+        """Reads an index written by `dump`."""
+        k1, b, total_length, lengths, docs, tfs, terms = pickle.load(f)
+        index = cls(k1, b)
+        index.total_length = total_length
+        index.doc_lengths.frombytes(lengths)
+        index._frozen_docs.frombytes(docs)
+        index._frozen_tfs.frombytes(tfs)
+        index._frozen = terms
+        return index
+
+    def _ranked(self, postings, n, avg_length):
+        """The term's groups as (weight, doc ids), best first; cached until the index grows."""
+        key = (n, self.total_length)
+        if postings.ranked is None or postings.ranked[:2] != key:
+            df = len(postings.docs)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            ranked = [(self._weight(idf, tf, length, avg_length), docs) for (tf, length), docs in postings.groups.items()]
+            ranked.sort(key=lambda group: group[0], reverse=True)
+            postings.ranked = key + (ranked, idf)
+        return postings.ranked[2], postings.ranked[3]
+
+    def _weight(self, idf, tf, length, avg_length):
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+
+    def search(self, query, k=5):
+        """Returns up to k (score, doc_id) pairs, best first (newer documents win ties)."""
+        n = len(self.doc_lengths)
+        if not n or k <= 0:
+            return []
+        avg_length = self.total_length / n or 1.0
+        terms = []  # (postings, idf, cursor) in a fixed order, so scores always sum alike
+        for term in sorted(set(tokenize(query))):
+            postings = self._postings(term)
+            if postings:
+                ranked, idf = self._ranked(postings, n, avg_length)
+                terms.append((postings, idf, _Cursor(ranked)))
+        if not terms:
+            return []
+
+        # A document read from one list scores at most its weight there plus the best
+        # weight of every other list; documents that cannot reach the top k are not scored
+        best = [cursor.peek()[0] for _, _, cursor in terms]
+        slack = [sum(best[:i] + best[i + 1:]) * (1 + 1e-9) for i in range(len(best))]  # margin for rounding
+        top, seen = [], set()  # min-heap of the best (score, doc_id) so far
+        while True:
+            heads = [cursor.peek() for _, _, cursor in terms]
+            live = [head for head in heads if head is not None]
+            if not live:
+                break
+            if len(top) == k:
+                # An unread document scores at most the sum of the next weights, and to tie
+                # that it must be unread in every list, so its id is below every next id
+                threshold = sum(weight for weight, _ in live)
+                if (threshold, min(doc_id for _, doc_id in live)) <= top[0]:
+                    break
+            for (postings, idf, cursor), head, rest in zip(terms, heads, slack):
+                if head is None:
+                    continue
+                cursor.advance()
+                weight, doc_id = head
+                if doc_id in seen or (len(top) == k and (weight + rest, doc_id) <= top[0]):
+                    continue
+                seen.add(doc_id)
+                length = self.doc_lengths[doc_id]
+                score = 0.0
+                for other, other_idf, _ in terms:
+                    tf = other.tf(doc_id)
+                    if tf:
+                        score += self._weight(other_idf, tf, length, avg_length)
+                if len(top) < k:
+                    heapq.heappush(top, (score, doc_id))
+                elif (score, doc_id) > top[0]:
+                    heapq.heapreplace(top, (score, doc_id))
+        return sorted(top, reverse=True)
@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Inputs that are published by the environment itself rather than by a step.
+EXTERNAL_INPUTS = {"User"}
+
+
+class WorkflowError(ValueError):
+    """Raised when workflow.json does not describe a valid step graph."""
+
+
+class DispatchError(RuntimeError):
+    """A dispatched job failed on its worker, was given up on, or was cancelled."""
+
+
+class StepGraph:
+    """
+    Dependency graph built from the `requires`/`produces` fields of workflow.json.
+    A requirement may name an upstream step or one of the artifacts it produces.
+    """
+    def __init__(self, workflow, external_inputs=EXTERNAL_INPUTS):
+        self.steps = {}
+        self.order = []
+        self.dependencies = {}  # {step_name: set(upstream step names)}
+        self.dependents = {}    # {step_name: set(downstream step names)}
+
+        producers = {}
+        for step in workflow:
+            name = step["step"]
+            if name in self.steps:
+                raise WorkflowError(f"Duplicate step '{name}'")
+            self.steps[name] = step
+            self.order.append(name)
+            producers[name] = name
+            for artifact in step.get("produces", []):
+                if artifact in producers and producers[artifact] != name:
+                    raise WorkflowError(f"Artifact '{artifact}' is produced by both '{producers[artifact]}' and '{name}'")
+                producers[artifact] = name
+
+        for name in self.order:
+            self.dependencies[name] = set()
+            self.dependents.setdefault(name, set())
+            for requirement in self.steps[name].get("requires", []):
+                if requirement in external_inputs:
+                    continue
+                upstream = producers.get(requirement)
+                if upstream is None:
+                    raise WorkflowError(f"Step '{name}' requires '{requirement}' but no step produces it")
+                if upstream == name:
+                    raise WorkflowError(f"Step '{name}' requires its own output '{requirement}'")
+                self.dependencies[name].add(upstream)
+                self.dependents.setdefault(upstream, set()).add(name)
+
+        self.topological_order()
+
+    def topological_order(self):
+        """Kahn's algorithm; ties are broken by declaration order so runs are reproducible."""
+        position = {name: i for i, name in enumerate(self.order)}
+        remaining = {name: len(deps) for name, deps in self.dependencies.items()}
+        ready = [name for name in self.order if remaining[name] == 0]
+        ordered = []
+        while ready:
+            ready.sort(key=position.get)
+            name = ready.pop(0)
+            ordered.append(name)
+            for child in self.dependents[name]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if len(ordered) != len(self.order):
+            cyclic = [name for name in self.order if remaining[name] > 0]
+            raise WorkflowError(f"Cycle detected between steps: {', '.join(cyclic)}")
+        return ordered
+
+    def width(self):
+        """Upper bound on how many steps can usefully run at once."""
+        depth = {}
+        for name in self.topological_order():
+            depth[name] = max((depth[d] + 1 for d in self.dependencies[name]), default=0)
+        levels = {}
+        for level in depth.values():
+            levels[level] = levels.get(level, 0) + 1
+        return max(levels.values(), default=0)
+
+
+class DAGScheduler:
+    """
+    Runs the steps of a StepGraph on a bounded thread pool. A step is submitted as
+    soon as all of its upstream steps succeeded; the first failure stops new
+    submissions and the scheduler drains whatever is still in flight.
+    """
+    def __init__(self, graph: StepGraph, max_workers=4):
+        self.graph = graph
+        self.max_workers = max(1, max_workers)
+
+    def run(self, run_step):
+        """
+        `run_step(step)` executes one step definition and returns True on success.
+        Returns True only if every step succeeded.
+        """
+        remaining = {name: len(deps) for name, deps in self.graph.dependencies.items()}
+        position = {name: i for i, name in enumerate(self.graph.order)}
+        ready = [name for name in self.graph.order if remaining[name] == 0]
+        in_flight = {}
+        failed = False
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, self.graph.width() or 1)) as pool:
+            while ready or in_flight:
+                if not failed:
+                    ready.sort(key=position.get)
+                    for name in ready:
+                        in_flight[pool.submit(run_step, self.graph.steps[name])] = name
+                ready = []
+
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = in_flight.pop(future)
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        print(f"[!!] Step {name} raised: {e}")
+                        ok = False
+                    if not ok:
+                        failed = True
+                        continue
+                    for child in self.graph.dependents[name]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            ready.append(child)
+
+        return not failed
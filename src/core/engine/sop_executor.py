@@ -1,66 +1,418 @@
-from src.core.engine.message_pool import Message, MessagePool
-from src.core.engine.executor import Executor
-from src.core.engine.memory_manager import MemoryManager
-from src.core.sop.validators import get_validator
+from src.core.engine.message_pool import Message, MessagePool, StagingPool
+from src.core.engine.message_log import MessageLog
+from src.core.engine.scheduler import StepGraph, DAGScheduler, DispatchError, WorkflowError
+from src.core.engine.profiler import profiler
+from src.core.traceability import TraceabilityMatrix
+from src.core.engine.speculation import speculation_policies
+from src.core.sop.validators import ValidationResult, resolve_validators
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING
 import json
 import os
+import threading
+import time
+import uuid
+
+if TYPE_CHECKING:  # annotations only; the executor pulls in asyncio
+    from src.core.engine.checkpoint import CheckpointStore
+    from src.core.engine.executor import Executor
+    from src.core.engine.memory_manager import MemoryManager
+    from src.core.engine.work_queue import WorkQueue
 
 class Environment:
+    """
+    Holds the message pool and an ordered registry of roles, looked up by name
+    or profile. Roles can be registered ready-made (`add_role`) or as factories
+    (`add_factory`) that are only called the first time the role is needed.
+    """
     def __init__(self):
-        self.roles = set()
+        self.roles = {}          # {name: role} for constructed roles, in registration order
+        self._factories = {}     # {name: factory} for roles not constructed yet
+        self._order = []         # every registered name, constructed or not
+        self._profiles = {}      # {profile: name}
+        self._lock = threading.Lock()
         self.message_pool = MessagePool()
 
+    def _register(self, name, profile):
+        if name in self._order:
+            raise ValueError(f"Duplicate role name '{name}'")
+        if profile is not None:
+            self._claim_profile(name, profile)
+
+    def _claim_profile(self, name, profile):
+        owner = self._profiles.setdefault(profile, name)
+        if owner != name:
+            raise ValueError(f"Role '{name}' reuses profile '{profile}' of role '{owner}'")
+
     def add_role(self, role):
-        self.roles.add(role)
+        with self._lock:
+            self._register(role.name, role.profile)
+            self._order.append(role.name)
+            self.roles[role.name] = role
+
+    def add_factory(self, name, factory, profile=None):
+        """
+        Registers `factory()` to build role `name` on first lookup. Give `profile`
+        when steps may refer to the role by profile before it is constructed.
+        """
+        with self._lock:
+            self._register(name, profile)
+            self._order.append(name)
+            self._factories[name] = factory
+
+    def _construct(self, name):
+        role = self._factories.pop(name)()
+        if role.name != name:
+            raise ValueError(f"Factory for role '{name}' built a role named '{role.name}'")
+        self._claim_profile(name, role.profile)
+        self.roles[name] = role
+        return role
+
+    def _resolve(self, key):
+        if key in self.roles or key in self._factories:
+            return key
+        return self._profiles.get(key)
+
+    def has_role(self, key):
+        """True if a role with this name or profile is registered, without constructing it."""
+        return self._resolve(key) is not None
+
+    def get_role(self, key):
+        """The role with this name (or else profile), constructed on first use; None if unknown."""
+        role = self.roles.get(key)
+        if role is not None:
+            return role
+        with self._lock:
+            name = self._resolve(key)
+            if name is None:
+                return None
+            if name in self._factories:
+                return self._construct(name)
+            return self.roles[name]
+
+    def role_names(self):
+        """Every registered role name in registration order, without constructing any."""
+        with self._lock:
+            return list(self._order)
 
     def publish_message(self, message: Message):
         self.message_pool.publish(message)
 
     def get_roles(self):
-        return self.roles
+        """Every registered role in registration order, constructing any pending ones."""
+        with self._lock:
+            for name in [n for n in self._order if n in self._factories]:
+                self._construct(name)
+            return [self.roles[name] for name in self._order]
+
+    def reset(self, log=None):
+        """
+        Start a fresh session: roles are kept, the message pool is replaced. With a
+        MessageLog, the new pool is durable.
+        """
+        if self.message_pool.log is not None:
+            self.message_pool.log.close()
+        self.message_pool = MessagePool(log=log)
 
 class SOPExecutor:
-    def __init__(self, env: Environment, executor: Executor, memory: MemoryManager, workflow_path="src/core/sop/workflow.json"):
+    def __init__(self, env: Environment, executor: "Executor", memory: "MemoryManager", workflow_path="src/core/sop/workflow.json", max_workers=4, checkpoints: "CheckpointStore" = None, trace: TraceabilityMatrix = None, sessions=None, queue: "WorkQueue" = None, dispatch_timeout=None):
         self.env = env
         self.executor = executor
         self.memory = memory
+        self.checkpoints = checkpoints
+        self.trace = trace
+        self.sessions = sessions  # directory for durable per-run message logs, or None
+        self.session_path = None
+        self.queue = queue  # with a WorkQueue, agents act on remote workers instead of in-process
+        self.dispatch_timeout = dispatch_timeout
+        self.run_id = None
+        self.idea = None
         self.workflow_path = workflow_path
         with open(workflow_path, "r") as f:
             self.workflow = json.load(f)
+        # Fails fast on cycles and missing producers, before any agent runs
+        self.graph = StepGraph(self.workflow)
+        self.validators = resolve_validators(self.workflow)
+        self._check_bindings()
+        self.speculation = speculation_policies(self.workflow)
+        self.scheduler = DAGScheduler(self.graph, max_workers=max_workers)
+        self._agent_locks = {}
+        self._agent_locks_guard = threading.Lock()
+        self._listeners = []
+        self._hooked_pool = None
+
+    def _check_bindings(self):
+        unbound = [f"'{step['agent']}' (step '{step['step']}')" for step in self.workflow if not self.env.has_role(step["agent"])]
+        if unbound:
+            raise WorkflowError(f"No role registered for agent(s): {', '.join(unbound)}")
+
+    def subscribe(self, callback):
+        """
+        Registers `callback(event)` for the run's event stream. Events are dicts with
+        a "type" of run_started, step_started, step_replayed, attempt, dispatched,
+        validated, validation_failed, attempt_cancelled, step_failed,
+        message_published or run_finished. Callbacks
+        may be invoked from scheduler worker threads.
+        """
+        self._listeners.append(callback)
+
+    def _emit(self, event_type, **fields):
+        if not self._listeners:
+            return
+        event = {"type": event_type, "time": time.time(), **fields}
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[!] Event listener failed on {event_type}: {e}")
 
-    def run(self, user_idea):
+    def _hook_pool(self):
+        pool = self.env.message_pool
+        if pool is not self._hooked_pool:
+            pool.add_listener(lambda message: self._emit("message_published", message=message))
+            self._hooked_pool = pool
+
+    def _agent_lock(self, agent_name):
+        # Two steps bound to the same agent must not act concurrently
+        with self._agent_locks_guard:
+            return self._agent_locks.setdefault(agent_name, threading.Lock())
+
+    def run(self, user_idea, run_id=None):
         print(f"[*] ENV START: {user_idea}")
+        self.idea = user_idea
+        if self.checkpoints:
+            self.run_id = self.checkpoints.start_run(user_idea, run_id)
+            print(f"[*] Run ID: {self.run_id}")
+        if self.sessions:
+            self.session_path = self._new_session_path()
+            self.env.reset(MessageLog(self.session_path))
+            print(f"[*] Session log: {self.session_path}")
+        self._hook_pool()
+        self._emit("run_started", idea=user_idea, run_id=self.run_id)
         
         self.env.publish_message(Message(role="User", content=user_idea))
 
-        for step in self.workflow:
-            step_name = step["step"]
-            agent_name = step["agent"]
-            validator_name = step["validator"]
-            max_retries = step.get("max_retries", 1)
+        success = self.scheduler.run(self._run_step)
+        if self.checkpoints:
+            self.checkpoints.finish_run(self.run_id, success)
+        self._emit("run_finished", success=success, run_id=self.run_id)
+        return success
+
+    def _new_session_path(self):
+        # A resumed run gets a new log next to the earlier ones: <run id>.1, <run id>.2, ...
+        base = os.path.join(self.sessions, self.run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}")
+        path, n = base, 0
+        while os.path.exists(path):
+            n += 1
+            path = f"{base}.{n}"
+        return path
+
+    def _record_lineage(self, step):
+        # Lineage follows the workflow edges of every step that completed
+        if self.trace is None:
+            return
+        for upstream in step.get("requires", []):
+            self.trace.link(upstream, step["step"], "requires")
+        for artifact in step.get("produces", []):
+            self.trace.link(step["step"], artifact, "produces")
 
-            # Find agent by Name (Alice, Bob) OR Profile (Product Manager)
-            agent = next((r for r in self.env.get_roles() if r.name == agent_name), None)
-            
-            if not agent:
-                print(f"[!] Critical Error: Agent '{agent_name}' not found for step '{step_name}'")
-                return False
+    def _act(self, agent, step, attempt, pool, jobs=None):
+        """
+        One attempt of `step`. Without a work queue the agent acts in-process.
+        With one, the attempt is sent as a job carrying the messages the agent
+        observes, and the output and messages a worker's copy of the agent
+        produced are published into `pool` here, as if it had acted locally.
+        Ids of dispatched jobs are appended to `jobs`, so they can be cancelled.
+        """
+        if self.queue is None:
+            return agent.act(pool)
+        from src.core.engine.work_queue import message_from_dict, message_to_dict  # sqlite3 stays off local runs
 
-            success = False
+        payload = {
+            "run_id": self.run_id,
+            "step": step,
+            "attempt": attempt,
+            "observed": [message_to_dict(m) for m in pool.fetch(agent)],
+        }
+        job_id = self.queue.put(agent.name, payload)
+        if jobs is not None:
+            jobs.append(job_id)
+        self._emit("dispatched", step=step["step"], agent=agent.name, attempt=attempt, job=job_id)
+        try:
+            result = self.queue.wait(job_id, timeout=self.dispatch_timeout)
+        except TimeoutError as e:
+            self.queue.cancel(job_id)
+            raise DispatchError(str(e)) from e
+        if "error" in result:
+            raise DispatchError(f"Job {job_id} for {agent.name} failed: {result['error']}")
+        for m in result["messages"]:
+            pool.publish(message_from_dict(m))
+        return result["output"]
+
+    def _replay_step(self, step, agent, key):
+        """Publish a checkpointed step output instead of calling the agent."""
+        record = self.checkpoints.load_step(key)
+        if record is None or not self.validators[step["step"]](record["output"]):
+            return False
+        # Messages alone do not bring back files the step wrote; a role that cannot restore them runs again
+        if not agent.restore(record["output"]):
+            return False
+        for m in record["messages"]:
+            self.env.publish_message(Message(role=m["role"], content=m["content"], cause_by=m["cause_by"], sent_from=m["sent_from"]))
+        self.checkpoints.record_step(self.run_id, step["step"], key, cached=True)
+        print(f"[*] Step: {step['step']} ({agent.name}) | Replayed from checkpoint")
+        self._emit("step_replayed", step=step["step"], agent=agent.name)
+        return True
+
+    def _run_step(self, step):
+        with profiler.span(step["step"], "step", agent=step["agent"]) as span:
+            return self._execute_step(step, span)
+
+    def _execute_step(self, step, span):
+        step_name = step["step"]
+        agent_name = step["agent"]
+        validator = self.validators[step_name]
+        max_retries = step.get("max_retries", 1)
+
+        # Find agent by Name (Alice, Bob) OR Profile (Product Manager); bindings were checked at load
+        agent = self.env.get_role(agent_name)
+        self._emit("step_started", step=step_name, agent=agent.name)
+
+        key = None
+        if self.checkpoints:
+            observed = self.env.message_pool.fetch(agent)
+            key = self.checkpoints.step_key(step, agent, observed, agent.state_key())
+            if self._replay_step(step, agent, key):
+                span.set(replayed=True)
+                self._record_lineage(step)
+                return True
+
+        if step_name in self.speculation:
+            if not agent.writes_workspace:
+                with self._agent_lock(agent.name):
+                    return self._speculate(step, agent, validator, key, span)
+            print(f"[!] Step {step_name}: {agent.name} writes to the workspace, so its attempts run one at a time")
+
+        success = False
+        with self._agent_lock(agent.name):
             for attempt in range(max_retries + 1):
                 print(f"[*] Step: {step_name} ({agent.name}) | Attempt: {attempt + 1}")
-                output = agent.act(self.env.message_pool)
-                
-                validator = get_validator(validator_name)
-                if validator(output):
+                self._emit("attempt", step=step_name, agent=agent.name, attempt=attempt + 1)
+                start = len(self.env.message_pool.messages)
+                try:
+                    with profiler.span(f"{agent.name}.act", "agent", step=step_name, attempt=attempt + 1):
+                        output = self._act(agent, step, attempt + 1, self.env.message_pool)
+                except DispatchError as e:
+                    # No worker answered in time or the job failed remotely: a failed attempt like an invalid output
+                    output, result = None, ValidationResult(False, step["validator"], [f"dispatch failed: {e}"])
+                else:
+                    with profiler.span(step["validator"], "validator", step=step_name):
+                        result = validator(output)
+                published = [m for m in self.env.message_pool.messages[start:] if m.sent_from == agent.name]
+                if profiler.enabled:
+                    span.set(attempts=attempt + 1, bytes_published=span.args.get("bytes_published", 0) + sum(m.size for m in published))
+                if result:
                     print(f"[+] validated.")
+                    self._emit("validated", step=step_name, agent=agent.name, attempt=attempt + 1)
                     success = True
+                    if key:
+                        self.checkpoints.save_step(key, step_name, output, published)
+                        self.checkpoints.record_step(self.run_id, step_name, key, cached=False)
                     break
                 else:
-                    print(f"[-] validation failed.")
+                    print(f"[-] validation failed: {'; '.join(result.diagnostics)}")
+                    self._emit("validation_failed", step=step_name, agent=agent.name, attempt=attempt + 1, diagnostics=result.diagnostics)
 
-            if not success:
-                print(f"[!!] Step {step_name} failed critical validation path.")
-                return False
+        if not success:
+            self._fail_step(step_name, agent, result.diagnostics)
+            return False
 
+        self._record_lineage(step)
         return True
+
+    def _speculate(self, step, agent, validator, key, span):
+        """
+        Runs the step's attempts under its SpeculationPolicy. Each attempt acts on
+        its own fork of the agent against a StagingPool; the first output that
+        validates has its messages published, every other attempt is discarded
+        without publishing. Attempts still running are abandoned, not interrupted.
+        """
+        step_name = step["step"]
+        policy = self.speculation[step_name]
+        budget = step.get("max_retries", 1) + 1
+        pool = ThreadPoolExecutor(max_workers=policy.parallel, thread_name_prefix=f"attempt-{agent.name}")
+        running = {}  # {future: (attempt number, staging pool, dispatched job ids)}
+        launched, last_launch = 0, 0.0
+
+        def attempt(number, fork, staging, jobs):
+            started = time.perf_counter()
+            try:
+                with profiler.span(f"{agent.name}.act", "agent", step=step_name, attempt=number, speculative=True):
+                    output = self._act(fork, step, number, staging, jobs)
+                with profiler.span(step["validator"], "validator", step=step_name):
+                    result = validator(output)
+            except Exception as e:
+                output, result = None, ValidationResult(False, step["validator"], [f"attempt raised {type(e).__name__}: {e}"])
+            return output, result, time.perf_counter() - started
+
+        def launch(hedge=False):
+            nonlocal launched, last_launch
+            launched += 1
+            print(f"[*] Step: {step_name} ({agent.name}) | Attempt: {launched}{' (hedge)' if hedge else ''}")
+            self._emit("attempt", step=step_name, agent=agent.name, attempt=launched, speculative=True, hedge=hedge)
+            staging, jobs = StagingPool(self.env.message_pool), []
+            running[pool.submit(attempt, launched, agent.fork(), staging, jobs)] = (launched, staging, jobs)
+            last_launch = time.monotonic()
+
+        try:
+            for _ in range(min(policy.width(), budget)):
+                launch()
+            while running:
+                timeout = None
+                if policy.hedged and launched < budget and len(running) < policy.parallel:
+                    timeout = max(0.0, last_launch + policy.hedge_delay() - time.monotonic())
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    launch(hedge=True)
+                    continue
+                for future in done:
+                    number, staging, _ = running.pop(future)
+                    output, result, elapsed = future.result()
+                    policy.record(elapsed)
+                    if not result:
+                        staging.discard()
+                        print(f"[-] validation failed: {'; '.join(result.diagnostics)}")
+                        self._emit("validation_failed", step=step_name, agent=agent.name, attempt=number, diagnostics=result.diagnostics)
+                        continue
+                    for other, (other_number, other_staging, other_jobs) in running.items():
+                        other_staging.discard()
+                        other.cancel()
+                        for job_id in other_jobs:
+                            # Also ends the abandoned attempt's wait on the queue
+                            self.queue.cancel(job_id)
+                        self._emit("attempt_cancelled", step=step_name, agent=agent.name, attempt=other_number)
+                    running.clear()
+                    published = staging.commit()
+                    print(f"[+] validated.")
+                    self._emit("validated", step=step_name, agent=agent.name, attempt=number)
+                    if profiler.enabled:
+                        span.set(attempts=launched, bytes_published=sum(m.size for m in published))
+                    if key:
+                        self.checkpoints.save_step(key, step_name, output, published)
+                        self.checkpoints.record_step(self.run_id, step_name, key, cached=False)
+                    self._record_lineage(step)
+                    return True
+                while launched < budget and len(running) < policy.width():
+                    launch()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        self._fail_step(step_name, agent, result.diagnostics)
+        return False
+
+    def _fail_step(self, step_name, agent, diagnostics):
+        print(f"[!!] Step {step_name} failed critical validation path.")
+        self._emit("step_failed", step=step_name, agent=agent.name, reason="validation")
+        if self.memory:
+            # Agents of later runs recall it through Role.get_memory_context
+            self.memory.add_failure({"idea": self.idea, "step": step_name, "agent": agent.name, "diagnostics": diagnostics})
@@ -0,0 +1,70 @@
+import math
+import threading
+from collections import deque
+
+from src.core.engine.scheduler import WorkflowError
+
+SPECULATE_KEYS = {"parallel", "hedge_percentile", "hedge_after", "min_samples"}
+DEFAULT_HEDGE_AFTER = 1.0  # seconds, until enough latencies have been seen
+
+
+class SpeculationPolicy:
+    """
+    Opt-in speculative execution for one step, from the step's "speculate" field
+    in workflow.json:
+
+        "speculate": {"parallel": 3}
+            Run up to 3 attempts at once; a failed attempt is replaced right away.
+        "speculate": {"hedge_percentile": 95, "hedge_after": 2.0, "parallel": 2}
+            Run one attempt; when it is still running after the step's observed
+            95th-percentile latency (or `hedge_after` seconds until `min_samples`
+            latencies are known), start another, up to `parallel` at once.
+
+    The step's `max_retries + 1` still bounds the total number of attempts.
+    Steps whose agent writes to the workspace (`Role.writes_workspace`) are
+    run without speculation.
+    """
+    def __init__(self, step_name, spec):
+        unknown = set(spec) - SPECULATE_KEYS
+        if unknown:
+            raise WorkflowError(f"Step '{step_name}': unknown speculate option(s) {sorted(unknown)}")
+        self.hedge_percentile = spec.get("hedge_percentile")
+        self.hedge_after = spec.get("hedge_after")
+        self.hedged = self.hedge_percentile is not None or self.hedge_after is not None
+        self.parallel = spec.get("parallel", 2 if self.hedged else 1)
+        self.min_samples = spec.get("min_samples", 5)
+        if not isinstance(self.parallel, int) or self.parallel < 1:
+            raise WorkflowError(f"Step '{step_name}': speculate.parallel must be a positive integer")
+        if self.hedge_percentile is not None and not 0 < self.hedge_percentile <= 100:
+            raise WorkflowError(f"Step '{step_name}': speculate.hedge_percentile must be in (0, 100]")
+        if self.hedge_after is not None and self.hedge_after < 0:
+            raise WorkflowError(f"Step '{step_name}': speculate.hedge_after must not be negative")
+        if self.hedge_after is None:
+            self.hedge_after = DEFAULT_HEDGE_AFTER
+        if self.hedge_percentile is None:
+            self.hedge_percentile = 95
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Adds the latency of a finished attempt to the step's history."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self):
+        """Seconds an attempt may run before a hedge attempt is started."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.hedge_after
+            ordered = sorted(self._latencies)
+        # Nearest-rank percentile
+        return ordered[max(0, math.ceil(self.hedge_percentile / 100 * len(ordered)) - 1)]
+
+    def width(self):
+        """How many attempts may run at once before any hedge is due."""
+        return 1 if self.hedged else self.parallel
+
+
+def speculation_policies(workflow):
+    """Maps the name of every step with a "speculate" field to its SpeculationPolicy."""
+    return {step["step"]: SpeculationPolicy(step["step"], step["speculate"]) for step in workflow if step.get("speculate")}
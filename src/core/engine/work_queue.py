@@ -0,0 +1,208 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from src.core.engine.message_pool import Message
+from src.core.engine.scheduler import DispatchError
+
+DEFAULT_LEASE_SECONDS = 30.0
+DEFAULT_MAX_DELIVERIES = 3
+
+
+def message_to_dict(message):
+    return {"role": message.role, "content": message.content, "cause_by": message.cause_by, "sent_from": message.sent_from}
+
+
+def message_from_dict(data):
+    return Message(role=data["role"], content=data["content"], cause_by=data["cause_by"], sent_from=data["sent_from"])
+
+
+class Job:
+    """A leased job: the agent it is addressed to, its payload and how often it has been handed out."""
+    __slots__ = ("id", "agent", "payload", "deliveries")
+
+    def __init__(self, id, agent, payload, deliveries):
+        self.id = id
+        self.agent = agent
+        self.payload = payload
+        self.deliveries = deliveries
+
+
+class WorkQueue(abc.ABC):
+    """
+    Queue of step jobs between an orchestrator and the workers hosting agents.
+
+    A worker leases a job for a limited time and keeps the lease alive with
+    heartbeats while it works. A job whose lease runs out is handed to the next
+    worker that asks, so a worker that dies mid-step only delays the step; after
+    `max_deliveries` hand-outs the job is given up. Only the worker holding the
+    lease can complete a job, so a worker that lost its lease cannot overwrite
+    the result of the one that took over.
+
+    Results are dicts; a failed or abandoned job's result has an "error" key.
+    """
+    @abc.abstractmethod
+    def put(self, agent, payload):
+        """Enqueues a job for the role named `agent`; returns the job id."""
+
+    @abc.abstractmethod
+    def lease(self, worker_id, agents=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """The oldest available job for one of `agents` (any agent if None), leased to `worker_id`; None if there is none."""
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extends the lease; False if `worker_id` no longer holds the job."""
+
+    @abc.abstractmethod
+    def complete(self, job_id, worker_id, result):
+        """Records the job's result; False if `worker_id` no longer holds the job."""
+
+    @abc.abstractmethod
+    def cancel(self, job_id):
+        """Withdraws a job that is not finished yet; its worker's result will be rejected."""
+
+    @abc.abstractmethod
+    def poll(self, job_id):
+        """The job's result, or None while it is still queued or leased. Raises DispatchError if it was cancelled."""
+
+    def wait(self, job_id, timeout=None, interval=0.02, max_interval=0.5):
+        """Polls until the job has a result, backing off between polls. Raises TimeoutError after `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = self.poll(job_id)
+            if result is not None:
+                return result
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+            time.sleep(interval if deadline is None else min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(interval * 2, max_interval)
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    WorkQueue in a single SQLite file, for running workers as separate processes
+    on one host. Each thread gets its own connection; leases are taken inside
+    an immediate transaction so two workers never get the same job.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            agent TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'queued',  -- queued, leased, done, dead or cancelled
+            worker TEXT,
+            lease_until REAL,
+            deliveries INTEGER NOT NULL DEFAULT 0,
+            result TEXT,
+            created REAL NOT NULL,
+            finished REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, created);
+    """
+
+    def __init__(self, path="workspace/queue.db", max_deliveries=DEFAULT_MAX_DELIVERIES):
+        self.path = os.path.abspath(path)
+        self.max_deliveries = max_deliveries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; transactions are opened explicitly where they matter
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, agent, payload):
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, agent, payload, created) VALUES (?, ?, ?, ?)",
+            (job_id, agent, json.dumps(payload, ensure_ascii=False), time.time()),
+        )
+        return job_id
+
+    def lease(self, worker_id, agents=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        conn = self._connect()
+        query = "SELECT id, agent, payload, deliveries FROM jobs WHERE (state = 'queued' OR (state = 'leased' AND lease_until < ?))"
+        if agents is not None:
+            agents = list(agents)
+            query += f" AND agent IN ({', '.join('?' * len(agents))})"
+        query += " ORDER BY created LIMIT 1"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                now = time.time()
+                row = conn.execute(query, [now] + (agents or [])).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                job_id, agent, payload, deliveries = row
+                if deliveries >= self.max_deliveries:
+                    # Every worker it went to stopped heartbeating; do not hand it out again
+                    conn.execute("UPDATE jobs SET state = 'dead', result = ?, finished = ? WHERE id = ?", (json.dumps(self._abandoned(deliveries)), now, job_id))
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, deliveries = ? WHERE id = ?",
+                    (worker_id, now + lease_seconds, deliveries + 1, job_id),
+                )
+                conn.execute("COMMIT")
+                return Job(job_id, agent, json.loads(payload), deliveries + 1)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _abandoned(deliveries):
+        return {"error": f"Job abandoned after {deliveries} deliveries without a result"}
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+            (time.time() + lease_seconds, job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, result):
+        cursor = self._connect().execute(
+            "UPDATE jobs SET state = 'done', result = ?, finished = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+            (json.dumps(result, ensure_ascii=False), time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def cancel(self, job_id):
+        self._connect().execute(
+            "UPDATE jobs SET state = 'cancelled', finished = ? WHERE id = ? AND state IN ('queued', 'leased')",
+            (time.time(), job_id),
+        )
+
+    def poll(self, job_id):
+        conn = self._connect()
+        row = conn.execute("SELECT state, result, lease_until, deliveries FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown job {job_id}")
+        state, result, lease_until, deliveries = row
+        if state == "cancelled":
+            raise DispatchError(f"Job {job_id} was cancelled")
+        now = time.time()
+        if state == "leased" and lease_until < now and deliveries >= self.max_deliveries:
+            # Its last worker stopped heartbeating and no one may lease it again, so
+            # give up here rather than waiting for another worker to ask for work
+            error = self._abandoned(deliveries)
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'dead', result = ?, finished = ? WHERE id = ? AND state = 'leased' AND lease_until < ?",
+                (json.dumps(error), now, job_id, now),
+            )
+            # Otherwise the lease was renewed or the job finished since the read; the next poll sees it
+            return error if cursor.rowcount == 1 else None
+        return json.loads(result) if state in ("done", "dead") else None
+
+    def counts(self):
+        """{state: number of jobs}."""
+        return dict(self._connect().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
@@ -0,0 +1,77 @@
+import os
+import socket
+import threading
+import time
+import uuid
+
+from src.core.engine.message_pool import MessagePool
+from src.core.engine.work_queue import DEFAULT_LEASE_SECONDS, message_from_dict, message_to_dict
+
+
+class Worker:
+    """
+    Hosts the roles of an Environment and runs the step jobs addressed to them.
+
+    For each job, a fork of the role acts on a private MessagePool holding the
+    messages the orchestrator observed for it; the output and the messages the
+    role published go back as the job's result. Validation, retries and
+    publishing into the run's pool stay with the orchestrator. The lease is
+    renewed from a heartbeat thread while the role acts.
+    """
+    def __init__(self, queue, env, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, idle_sleep=0.2):
+        self.queue = queue
+        self.env = env
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.idle_sleep = idle_sleep
+        self.agents = env.role_names()
+
+    def _heartbeat(self, job, stop):
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds):
+                print(f"[!] Worker {self.worker_id}: lost the lease on job {job.id}")
+                return
+
+    def process(self, job):
+        """Acts on one leased job and completes it; False if the lease was lost meanwhile."""
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        beat.start()
+        try:
+            payload = job.payload
+            role = self.env.get_role(job.agent).fork()
+            pool = MessagePool()
+            for m in payload["observed"]:
+                pool.publish(message_from_dict(m))
+            start = len(pool.messages)
+            output = role.act(pool)
+            result = {"output": output, "messages": [message_to_dict(m) for m in pool.messages[start:]]}
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            stop.set()
+            beat.join()
+        return self.queue.complete(job.id, self.worker_id, result)
+
+    def run_once(self):
+        """Leases and processes one job; False if there was none."""
+        job = self.queue.lease(self.worker_id, self.agents, self.lease_seconds)
+        if job is None:
+            return False
+        step = job.payload.get("step", {}).get("step", "?")
+        print(f"[*] Worker {self.worker_id}: {step} ({job.agent}) | Delivery: {job.deliveries}")
+        if not self.process(job):
+            print(f"[!] Worker {self.worker_id}: result for job {job.id} was rejected")
+        return True
+
+    def run(self, stop=None, max_jobs=None):
+        """Serves jobs until `stop` (a threading.Event) is set or `max_jobs` have been processed."""
+        done = 0
+        while not (stop is not None and stop.is_set()) and (max_jobs is None or done < max_jobs):
+            if self.run_once():
+                done += 1
+            elif stop is not None:
+                stop.wait(self.idle_sleep)
+            else:
+                time.sleep(self.idle_sleep)
+        return done
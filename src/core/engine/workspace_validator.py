@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.engine.executor import Executor
+
+SKIP_DIRS = {"__pycache__", ".git", ".venv", "venv", "node_modules"}
+IMPORT_CHECK = "import importlib, sys; sys.path.insert(0, '.'); importlib.import_module(sys.argv[1])"
+
+
+def compile_file(path):
+    """Byte-compiles one file in memory. Runs in pool workers, so it must stay module-level."""
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            compile(f.read(), path, "exec", dont_inherit=True)
+        error = None
+    except SyntaxError as e:
+        error = f"{e.msg} (line {e.lineno})"
+    except (ValueError, OSError) as e:
+        error = str(e)
+    return path, error, (time.perf_counter() - started) * 1000
+
+
+def module_name(rel_path):
+    parts = rel_path[:-len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts or not all(p.isidentifier() for p in parts):
+        return None
+    return ".".join(parts)
+
+
+class WorkspaceValidator:
+    """
+    Validates a generated project tree: every .py file is byte-compiled (across a
+    process pool once there are enough files) and then imported in its own
+    subprocess. Syntax results are cached by a hash of the file's path and
+    content, so retries only re-compile files that changed. Whether a module
+    imports also depends on the files it imports, so import results are only
+    reused while no .py file in the tree has changed.
+    """
+    def __init__(self, executor: Executor = None, cache_path="workspace/cache/validation.json", max_workers=None, import_timeout=30, parallel_threshold=8):
+        self.executor = executor or Executor()
+        self.cache_path = cache_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.import_timeout = import_timeout
+        self.parallel_threshold = parallel_threshold
+        self._cache = self._load_cache()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty_cache():
+        # {"syntax": {file key: error}, "imports": {"tree": tree digest, "results": {path: error}}}
+        return {"syntax": {}, "imports": {"tree": None, "results": {}}}
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return self._empty_cache()
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+        except json.JSONDecodeError:
+            return self._empty_cache()
+        # Caches written before import results were keyed on the tree are dropped
+        return cache if isinstance(cache, dict) and "syntax" in cache and "imports" in cache else self._empty_cache()
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp, self.cache_path)
+
+    @staticmethod
+    def discover(root):
+        files = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            files.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".py"))
+        return files
+
+    @staticmethod
+    def _key(rel_path, path):
+        digest = hashlib.sha256(f"{sys.version_info[0]}.{sys.version_info[1]}\0{rel_path}\0".encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _tree(keys):
+        return hashlib.sha256("".join(f"{rel_path}\0{key}\0" for rel_path, key in keys).encode()).hexdigest()
+
+    def tree_digest(self, root):
+        """Digest of the paths and contents of every .py file under `root`."""
+        keys = []
+        for path in self.discover(root):
+            rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+            keys.append((rel_path, self._key(rel_path, path)))
+        return self._tree(keys)
+
+    def _compile_all(self, paths):
+        if len(paths) < self.parallel_threshold or self.max_workers == 1:
+            return [compile_file(p) for p in paths]
+        # Only large trees take this path; the process pool machinery is imported on demand
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(compile_file, paths, chunksize=max(1, len(paths) // (self.max_workers * 4))))
+
+    def _import_check(self, root, rel_path):
+        name = module_name(rel_path)
+        if name is None:
+            return None, 0.0
+        command = f"{shlex.quote(sys.executable)} -c {shlex.quote(IMPORT_CHECK)} {shlex.quote(name)}"
+        result = self.executor.execute(command, cwd=root, timeout=self.import_timeout)
+        if result["success"]:
+            return None, result["duration"] * 1000
+        lines = result["stderr"].strip().splitlines()
+        return (lines[-1] if lines else f"exit code {result['code']}"), result["duration"] * 1000
+
+    def validate(self, root):
+        """Returns a report dict with per-file results and timings."""
+        started = time.perf_counter()
+        with self._lock:
+            syntax_cache = dict(self._cache["syntax"])
+            imports = self._cache["imports"]
+        entries = {}
+        pending = []
+        for path in self.discover(root):
+            rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+            key = self._key(rel_path, path)
+            entries[rel_path] = {"file": rel_path, "key": key, "syntax_ms": 0.0, "import_error": None, "import_ms": 0.0}
+            if key in syntax_cache:
+                entries[rel_path]["syntax_error"] = syntax_cache[key]
+                entries[rel_path]["cached"] = True
+            else:
+                pending.append(path)
+        tree = self._tree((e["file"], e["key"]) for e in entries.values())
+        import_cache = imports["results"] if imports["tree"] == tree else {}
+
+        for path, error, elapsed in self._compile_all(pending):
+            rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+            entries[rel_path].update(syntax_error=error, syntax_ms=elapsed, cached=False)
+
+        to_import = []
+        for entry in entries.values():
+            # Only a file whose syntax result was reused can reuse its import result
+            entry["cached"] = entry["cached"] and entry["file"] in import_cache
+            if entry["cached"]:
+                entry["import_error"] = import_cache[entry["file"]]
+            elif entry["syntax_error"] is None:
+                to_import.append(entry["file"])
+        with ThreadPoolExecutor(max_workers=max(1, self.executor.max_concurrency)) as pool:
+            for rel_path, (error, elapsed) in zip(to_import, pool.map(lambda r: self._import_check(root, r), to_import)):
+                entries[rel_path].update(import_error=error, import_ms=elapsed)
+
+        with self._lock:
+            for entry in entries.values():
+                self._cache["syntax"][entry.pop("key")] = entry["syntax_error"]
+            self._cache["imports"] = {"tree": tree, "results": {e["file"]: e["import_error"] for e in entries.values()}}
+            self._save_cache()
+
+        files = [entries[k] for k in sorted(entries)]
+        return {
+            "files": files,
+            "syntax_errors": [f for f in files if f["syntax_error"]],
+            "import_errors": [f for f in files if f["import_error"]],
+            "cached": sum(1 for f in files if f["cached"]),
+            "total_ms": (time.perf_counter() - started) * 1000
+        }
@@ -1,68 +1,192 @@
 import json
-import os
 import re
 
+# Largest JSON object validate_design will scan for, in characters
+MAX_JSON_SCAN = 1024 * 1024
+
+class ValidationResult:
+    """Outcome of one validator call. Truthy when the output passed."""
+    __slots__ = ("ok", "validator", "diagnostics")
+
+    def __init__(self, ok, validator, diagnostics=()):
+        self.ok = bool(ok)
+        self.validator = validator
+        self.diagnostics = list(diagnostics)
+
+    def __bool__(self):
+        return self.ok
+
+    def to_dict(self):
+        return {"ok": self.ok, "validator": self.validator, "diagnostics": self.diagnostics}
+
+    def __repr__(self):
+        return f"<ValidationResult {self.validator} ok={self.ok} {self.diagnostics}>"
+
+class TagScanner:
+    """
+    Finds which of a fixed set of tags occur in a text with a single compiled
+    alternation, stopping as soon as every tag has been seen.
+    """
+    def __init__(self, tags):
+        self.tags = tuple(tags)
+        ordered = sorted(self.tags, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(t) for t in ordered))
+        # A match of "Goals" also counts as a match of "Goal"
+        self._implies = {t: {u for u in self.tags if u in t} for t in self.tags}
+
+    def missing(self, content):
+        remaining = set(self.tags)
+        for match in self._pattern.finditer(content):
+            remaining -= self._implies[match.group(0)]
+            if not remaining:
+                return []
+        return [t for t in self.tags if t in remaining]
+
+_JSON_TOKEN = re.compile(r'[{}"]|\\.')
+
+def extract_json_object(content, max_chars=MAX_JSON_SCAN):
+    """
+    Returns (object, diagnostics) for the first brace-balanced, parseable JSON
+    object in `content`. Strings and escapes are respected while balancing, and
+    no candidate is scanned past `max_chars`.
+    """
+    diagnostics = []
+    start = content.find("{")
+    while start != -1:
+        depth, in_string, end = 0, False, None
+        limit = min(len(content), start + max_chars)
+        for token in _JSON_TOKEN.finditer(content, start, limit):
+            t = token.group(0)
+            if t == '"':
+                in_string = not in_string
+            elif in_string or len(t) == 2:
+                continue
+            elif t == "{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    end = token.end()
+                    break
+        if end is None:
+            diagnostics.append(f"unbalanced JSON object at offset {start} (scanned up to {limit - start} chars)")
+            return None, diagnostics
+        try:
+            return json.loads(content[start:end]), diagnostics
+        except json.JSONDecodeError as e:
+            diagnostics.append(f"invalid JSON at offset {start}: {e.msg}")
+        start = content.find("{", end)
+    diagnostics.append("no JSON object found")
+    return None, diagnostics
+
+_BA_TAGS = TagScanner(["Goals", "Risks"])
+_PRD_TAGS = TagScanner(["Goal", "Requirements"])
+_DELIVERY_TAGS = TagScanner(["Artifacts", "Ready"])
+_SIMPLICITY_TAGS = TagScanner(["TITLE:", "PURPOSE:", "OUTPUT:", "NEXT STEP:"])
+_CODE_TAGS = TagScanner(["Stored in", "Created"])
+_TEST_WORD = re.compile("test", re.IGNORECASE)
+_APPROVED_WORD = re.compile("APPROVED", re.IGNORECASE)
+_FAILED_CHECK = re.compile(r"\*\*([^*\n]+?) Check:\*\* Failed")
+
+def _require_tags(name, scanner, content):
+    if not content:
+        return ValidationResult(False, name, ["empty output"])
+    missing = scanner.missing(content)
+    return ValidationResult(not missing, name, [f"missing '{tag}'" for tag in missing])
+
 class SOPValidators:
     @staticmethod
     def validate_ba(content):
-        if not content: return False
-        return "Goals" in content and "Risks" in content
+        return _require_tags("validate_ba", _BA_TAGS, content)
 
     @staticmethod
     def validate_prd(content):
-        if not content: return False
-        return "Goal" in content and "Requirements" in content
+        return _require_tags("validate_prd", _PRD_TAGS, content)
 
     @staticmethod
     def validate_design(content):
-        try:
-            # Extract JSON if embedded in text
-            json_match = re.search(r"\{.*\}", content, re.DOTALL)
-            if json_match:
-                content = json_match.group(0)
-            
-            data = json.loads(content)
-            expected = ["modules", "files"] 
-            return any(key in data for key in expected)
-        except:
-            return False
+        if not content:
+            return ValidationResult(False, "validate_design", ["empty output"])
+        data, diagnostics = extract_json_object(content)
+        if data is None:
+            return ValidationResult(False, "validate_design", diagnostics)
+        expected = ["modules", "files"]
+        if isinstance(data, dict) and any(key in data for key in expected):
+            return ValidationResult(True, "validate_design", diagnostics)
+        return ValidationResult(False, "validate_design", diagnostics + [f"JSON object has none of {expected}"])
 
     @staticmethod
     def validate_tasks(content):
-        return len(content.strip()) > 0
+        ok = bool(content and content.strip())
+        return ValidationResult(ok, "validate_tasks", [] if ok else ["empty output"])
 
     @staticmethod
     def validate_code(content):
-        return "Stored in" in content or "Created" in content or len(content) > 10
+        content = content or ""
+        ok = len(content) > 10 or len(_CODE_TAGS.missing(content)) < len(_CODE_TAGS.tags)
+        return ValidationResult(ok, "validate_code", [] if ok else ["no code summary in output"])
 
     @staticmethod
     def validate_tests(content):
-        return "test" in content.lower()
+        ok = bool(content and _TEST_WORD.search(content))
+        return ValidationResult(ok, "validate_tests", [] if ok else ["output does not mention tests"])
 
     @staticmethod
     def validate_governance(content):
-        return "APPROVED" in content.upper()
+        ok = bool(content and _APPROVED_WORD.search(content))
+        return ValidationResult(ok, "validate_governance", [] if ok else ["output is not APPROVED"])
 
     @staticmethod
     def validate_delivery(content):
-        return "Artifacts" in content or "Ready" in content
+        if not content:
+            return ValidationResult(False, "validate_delivery", ["empty output"])
+        missing = _DELIVERY_TAGS.missing(content)
+        ok = len(missing) < len(_DELIVERY_TAGS.tags)
+        return ValidationResult(ok, "validate_delivery", [] if ok else ["missing 'Artifacts' or 'Ready'"])
 
     @staticmethod
     def validate_simplicity(content):
         """Checks if content follows the Clean Simple format."""
-        required = ["TITLE:", "PURPOSE:", "OUTPUT:", "NEXT STEP:"]
-        return all(tag in content for tag in required)
+        return _require_tags("validate_simplicity", _SIMPLICITY_TAGS, content)
+
+    @staticmethod
+    def validate_checks(content):
+        """Clean Simple format, and no "**<Name> Check:** Failed" line in the report."""
+        result = _require_tags("validate_checks", _SIMPLICITY_TAGS, content)
+        if not result:
+            return result
+        failed = _FAILED_CHECK.findall(content)
+        return ValidationResult(not failed, "validate_checks", [f"{name} check failed" for name in failed])
+
+# Built once at import; SOPExecutor resolves every step against it when the workflow loads
+VALIDATORS = {
+    "validate_ba": SOPValidators.validate_ba,
+    "validate_prd": SOPValidators.validate_prd,
+    "validate_design": SOPValidators.validate_design,
+    "validate_tasks": SOPValidators.validate_tasks,
+    "validate_code": SOPValidators.validate_code,
+    "validate_tests": SOPValidators.validate_tests,
+    "validate_governance": SOPValidators.validate_governance,
+    "validate_delivery": SOPValidators.validate_delivery,
+    "validate_simplicity": SOPValidators.validate_simplicity,
+    "validate_checks": SOPValidators.validate_checks
+}
 
 def get_validator(name):
-    validators = {
-        "validate_ba": SOPValidators.validate_ba,
-        "validate_prd": SOPValidators.validate_prd,
-        "validate_design": SOPValidators.validate_design,
-        "validate_tasks": SOPValidators.validate_tasks,
-        "validate_code": SOPValidators.validate_code,
-        "validate_tests": SOPValidators.validate_tests,
-        "validate_governance": SOPValidators.validate_governance,
-        "validate_delivery": SOPValidators.validate_delivery,
-        "validate_simplicity": SOPValidators.validate_simplicity
-    }
-    return validators.get(name, lambda x: True)
+    try:
+        return VALIDATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown validator '{name}'. Known validators: {', '.join(sorted(VALIDATORS))}") from None
+
+def resolve_validators(workflow):
+    """Maps every step name to its validator, rejecting unknown validator names."""
+    resolved, unknown = {}, []
+    for step in workflow:
+        name = step.get("validator")
+        if name in VALIDATORS:
+            resolved[step["step"]] = VALIDATORS[name]
+        else:
+            unknown.append(f"'{name}' (step '{step['step']}')")
+    if unknown:
+        raise ValueError(f"Unknown validator(s): {', '.join(unknown)}")
+    return resolved
@@ -1,26 +1,164 @@
+import json
+import os
+import threading
+from collections import deque
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND writes only
+    fcntl = None
+
 class TraceabilityMatrix:
-    def __init__(self):
-        self.matrix = {}  # {artifact_id: {upstream_id: ..., type: ...}}
+    """
+    Lineage graph of project artifacts. Every link is indexed both ways
+    (downstream -> upstreams and upstream -> downstreams), so ancestry and impact
+    queries are a single breadth-first walk that visits each artifact once, even
+    when the graph has multiple parents or cycles.
+
+    With a `path`, links are appended to a JSON Lines file and replayed when the
+    matrix is created again.
+    """
+    def __init__(self, path=None):
+        # Absolute, so workers that chdir into job directories keep one file
+        self.path = os.path.abspath(path) if path else None
+        self.matrix = {}     # {downstream_id: [link, ...]} in link order
+        self._children = {}  # {upstream_id: {downstream_id: None}} (dicts as ordered sets)
+        self._seen = set()   # (upstream, downstream, type) already linked
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # A writer may have died mid-line; only complete lines are links
+        for line in data[:data.rfind(b"\n") + 1].splitlines():
+            if line.strip():
+                self._index(json.loads(line))
+
+    def _index(self, link):
+        key = (link["upstream"], link["downstream"], link["type"])
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self.matrix.setdefault(link["downstream"], []).append(link)
+        self._children.setdefault(link["upstream"], {})[link["downstream"]] = None
+        return True
+
+    def _append(self, link):
+        data = (json.dumps(link) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
 
     def link(self, upstream_id: str, downstream_id: str, relationship="generates"):
-        if downstream_id not in self.matrix:
-            self.matrix[downstream_id] = []
-        self.matrix[downstream_id].append({
+        """Records that `downstream_id` derives from `upstream_id`. Returns False if the link already existed."""
+        link = {
             "upstream": upstream_id,
+            "downstream": downstream_id,
             "type": relationship,
             "timestamp": datetime.utcnow().isoformat()
-        })
+        }
+        with self._lock:
+            if not self._index(link):
+                return False
+            if self.path:
+                self._append(link)
+        return True
+
+    def parents(self, artifact_id):
+        return [link["upstream"] for link in self.matrix.get(artifact_id, ())]
+
+    def _downstream(self, artifact_id):
+        return self._children.get(artifact_id, ())
+
+    def children(self, artifact_id):
+        return list(self._downstream(artifact_id))
+
+    def _walk(self, artifact_id, neighbours):
+        # Breadth-first, nearest first; `seen` makes cycles terminate
+        seen = {artifact_id}
+        order = []
+        queue = deque([artifact_id])
+        while queue:
+            for nxt in neighbours(queue.popleft()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    order.append(nxt)
+                    queue.append(nxt)
+        return order
+
+    def ancestors(self, artifact_id):
+        """Every artifact `artifact_id` derives from, directly or not, nearest first."""
+        with self._lock:
+            return self._walk(artifact_id, self.parents)
+
+    def descendants(self, artifact_id):
+        """Every artifact derived from `artifact_id`, directly or not, nearest first."""
+        with self._lock:
+            return self._walk(artifact_id, self._downstream)
 
     def get_lineage(self, artifact_id):
-        """Recursively retrieve the lineage of an artifact."""
-        lineage = []
-        current = artifact_id
-        while current in self.matrix:
-            parent_link = self.matrix[current][0] # Simple linear lineage for now
-            lineage.append(parent_link)
-            current = parent_link['upstream']
-        return lineage
+        """
+        Retrieve the lineage of an artifact: the links to all of its ancestors,
+        nearest first. For a single-parent chain this is the chain of parent links.
+        """
+        with self._lock:
+            lineage = []
+            for current in [artifact_id] + self._walk(artifact_id, self.parents):
+                lineage.extend(self.matrix.get(current, ()))
+            return lineage
+
+    def impact(self, artifact_id):
+        """
+        Artifacts that must be regenerated if `artifact_id` changes, in an order
+        where every artifact comes after the ones it derives from. Artifacts on a
+        cycle are appended in breadth-first order once nothing else can go first.
+        """
+        with self._lock:
+            affected = self._walk(artifact_id, self._downstream)
+            members = set(affected)
+            pending = {a: len(members.intersection(self.parents(a))) for a in affected}
+            ready = deque(a for a in affected if pending[a] == 0)
+            order = []
+            while len(order) < len(affected):
+                if not ready:
+                    # Only cycles are left; break one at the earliest remaining artifact
+                    ready.append(next(a for a in affected if pending[a] > 0))
+                    pending[ready[0]] = 0
+                current = ready.popleft()
+                if pending[current] < 0:
+                    continue
+                order.append(current)
+                pending[current] = -1
+                for child in self._downstream(current):
+                    if child in members and pending[child] > 0:
+                        pending[child] -= 1
+                        if pending[child] == 0:
+                            ready.append(child)
+            return order
+
+    def to_dict(self):
+        """JSON graph of the project lineage."""
+        with self._lock:
+            links = [link for links in self.matrix.values() for link in links]
+            nodes = set(self.matrix) | set(self._children)
+        return {"nodes": sorted(nodes), "links": links}
+
+    def __len__(self):
+        return len(self._seen)
 
 trace_matrix = TraceabilityMatrix()
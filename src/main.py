@@ -1,59 +1,145 @@
-from src.core.engine.sop_executor import SOPExecutor, Environment
-from src.core.engine.executor import Executor
-from src.core.engine.memory_manager import MemoryManager
-from src.agents.implementations import (
-    GuideAgent, PlannerAgent, ArchitectAgent, 
-    BuilderAgent, TesterAgent, ShipperAgent
-)
-import sys
+import argparse
 import os
+import re
+import sys
+
+# Heavier modules (engine, agents, batch pool, service client) are imported by the
+# mode that needs them, so `--help`, remote and batch runs stay cheap to start.
+
+OUTPUT_RE = re.compile(r"OUTPUT:\s*(.*?)(?=NEXT STEP:)", re.DOTALL)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="AutoDev Studio CLI")
+    parser.add_argument("idea", nargs="*", help="What you want to build")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a previous run, replaying its checkpointed steps")
+    parser.add_argument("--batch", metavar="FILE", help="Run one idea per line from FILE ('-' for stdin), emitting JSON Lines results")
+    parser.add_argument("--workers", type=int, help="Worker processes for --batch (default: CPU count)")
+    parser.add_argument("--profile", metavar="TRACE", nargs="?", const="workspace/logs/trace.json", help="Record per-step timings; print a summary and write a Chrome trace (default: %(const)s)")
+    parser.add_argument("--profile-startup", action="store_true", help="Report per-module import cost of a local run and exit")
+    parser.add_argument("--queue", metavar="DB", help="Dispatch steps through this SQLite work queue to --worker processes")
+    parser.add_argument("--dispatch-timeout", type=float, default=600.0, metavar="SECONDS", help="Fail a dispatched step attempt that no worker finishes within SECONDS (default: %(default)s)")
+    parser.add_argument("--worker", action="store_true", help="Serve step jobs from --queue until interrupted")
+    parser.add_argument("--server", metavar="URL", default=os.environ.get("AUTODEV_SERVICE_URL"), help="Run on an orchestration service (default: $AUTODEV_SERVICE_URL)")
+    return parser.parse_args(argv)
 
 def main():
-    # 1. Setup Environment
-    env = Environment()
-    executor = Executor()
+    args = parse_args(sys.argv[1:])
+
+    if args.profile_startup:
+        from src.startup import profile_startup
+        profile_startup()
+        return
+
+    if args.batch:
+        from src.batch import run_batch
+        if args.batch == "-":
+            ok = run_batch(sys.stdin, workers=args.workers)
+        else:
+            with open(args.batch, "r") as f:
+                ok = run_batch(f, workers=args.workers)
+        sys.exit(0 if ok else 1)
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    if args.server:
+        run_remote(args)
+        return
+
+    from src.bootstrap import SESSIONS_DIR, build_engine
+    from src.core.engine.checkpoint import CheckpointStore
+    from src.core.engine.memory_manager import MemoryManager
+    from src.core.engine.profiler import profiler
+
+    queue = None
+    if args.queue:
+        from src.core.engine.work_queue import SQLiteWorkQueue
+        queue = SQLiteWorkQueue(args.queue)
+
+    # 1-3. Environment, roles and SOP engine
     memory = MemoryManager()
-    
-    # 2. Initialize User-Centric Roles
-    env.add_role(GuideAgent(memory))
-    env.add_role(PlannerAgent(memory))
-    env.add_role(ArchitectAgent(memory))
-    env.add_role(BuilderAgent(memory))
-    env.add_role(TesterAgent(memory))
-    env.add_role(ShipperAgent(memory))
-    
-    # 3. Initialize SOP Engine
-    workflow_path = os.path.join(os.path.dirname(__file__), "core/sop/workflow.json")
-    sop_engine = SOPExecutor(env, executor, memory, workflow_path=workflow_path)
+    checkpoints = CheckpointStore()
+    sop_engine = build_engine(memory, checkpoints=checkpoints, sessions=SESSIONS_DIR, queue=queue, dispatch_timeout=args.dispatch_timeout)
+    env = sop_engine.env
     
     # 4. User Request
-    user_idea = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else "A simple tool to organize files"
+    if args.resume:
+        run = checkpoints.load_run(args.resume)
+        if run is None:
+            print(f"[!] Unknown run: {args.resume}")
+            sys.exit(1)
+        user_idea = run["idea"]
+    else:
+        user_idea = idea_from(args)
     
-    print("\n" + "="*80)
-    print("                      AUTODEV STUDIO (User-Centric Mode)")
-    print("="*80)
+    print_banner()
     
-    success = sop_engine.run(user_idea)
+    if args.profile:
+        profiler.enable(trace_memory=True)
+    success = sop_engine.run(user_idea, run_id=args.resume)
     
     if success:
-        print("\n" + "="*80)
-        print("                        PROJECT COMPLETED")
-        print("="*80)
-        for msg in env.message_pool.messages:
-            if msg.role != "User":
-                print(f"\n### [{msg.role}] from {msg.sent_from}:")
-                print("-" * 30)
-                # Simple parser for CLI display
-                import re
-                try:
-                    content = re.search(r"OUTPUT:\s*(.*?)(?=NEXT STEP:)", msg.content, re.DOTALL).group(1).strip()
-                    print(content)
-                except:
-                    print(msg.content)
-            
-        print("\n[*] Project Ready in /workspace.")
+        print_project(env.message_pool.messages)
+    else:
+        print("[!] Project Failed.")
+        print(f"[*] Resume with: python src/main.py --resume {sop_engine.run_id}")
+
+    if args.profile:
+        print("\n" + profiler.format_summary())
+        print(f"[*] Trace written to {profiler.export_chrome_trace(args.profile)}")
+
+def run_worker(args):
+    """Worker mode: hosts the agents and runs the steps an orchestrator dispatches to --queue."""
+    from src.bootstrap import build_worker
+    from src.core.engine.work_queue import SQLiteWorkQueue
+
+    if not args.queue:
+        print("[!] --worker needs --queue.")
+        sys.exit(1)
+    worker = build_worker(SQLiteWorkQueue(args.queue))
+    print(f"[*] Worker {worker.worker_id} serving {', '.join(worker.agents)} from {args.queue}")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        # An unfinished job is redelivered once its lease runs out
+        print(f"\n[*] Worker {worker.worker_id} stopped.")
+
+def run_remote(args):
+    """Thin-client mode: the idea runs on a warm orchestration service."""
+    from src.service.client import ServiceClient
+
+    if args.resume:
+        print("[!] --resume is only available for local runs.")
+        sys.exit(1)
+    print_banner()
+    success, messages = ServiceClient(args.server).run(idea_from(args))
+    if success:
+        print_project(messages)
     else:
         print("[!] Project Failed.")
 
+def idea_from(args):
+    return " ".join(args.idea) if args.idea else "A simple tool to organize files"
+
+def print_banner():
+    print("\n" + "="*80)
+    print("                      AUTODEV STUDIO (User-Centric Mode)")
+    print("="*80)
+
+def print_project(messages):
+    print("\n" + "="*80)
+    print("                        PROJECT COMPLETED")
+    print("="*80)
+    for msg in messages:
+        if msg.role != "User":
+            print(f"\n### [{msg.role}] from {msg.sent_from}:")
+            print("-" * 30)
+            # Simple parser for CLI display
+            match = OUTPUT_RE.search(msg.content)
+            print(match.group(1).strip() if match else msg.content)
+        
+    print("\n[*] Project Ready in /workspace.")
+
 if __name__ == "__main__":
     main()
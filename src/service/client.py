@@ -0,0 +1,60 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+from src.core.engine.message_pool import Message
+
+class ServiceBusyError(RuntimeError):
+    """The service rejected a job because its queue is full."""
+
+class ServiceClient:
+    """Thin client for src/service/server.py."""
+    def __init__(self, base_url="http://127.0.0.1:8765", timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(f"{self.base_url}{path}", data=data, method=method, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 503:
+                raise ServiceBusyError(json.loads(e.read()).get("error", "service busy")) from None
+            raise
+
+    def submit(self, idea):
+        return self._request("POST", "/jobs", {"idea": idea})["job_id"]
+
+    def get(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def wait(self, job_id, poll_interval=0.2, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job["status"] in ("completed", "failed"):
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {job['status']}")
+            time.sleep(poll_interval)
+
+    def run(self, idea, busy_retries=30, **wait_kwargs):
+        """Submits an idea (retrying while the queue is full) and returns (success, messages)."""
+        for attempt in range(busy_retries + 1):
+            try:
+                job_id = self.submit(idea)
+                break
+            except ServiceBusyError:
+                if attempt == busy_retries:
+                    raise
+                time.sleep(1)
+        job = self.wait(job_id, **wait_kwargs)
+        result = job.get("result") or {}
+        messages = [
+            Message(role=m["role"], content=m["content"], cause_by=m["cause_by"], sent_from=m["sent_from"])
+            for m in result.get("messages", [])
+        ]
+        return job["status"] == "completed", messages
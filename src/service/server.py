@@ -0,0 +1,185 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import OrderedDict
+import argparse
+import json
+import os
+import threading
+import uuid
+
+from src.bootstrap import WORKFLOW_PATH
+
+# Per-process warm engine, built once by the pool initializer
+_ENGINE = None
+
+def _init_worker(memory_dir, workflow_path, trace_path):
+    global _ENGINE
+    from src.bootstrap import build_engine
+    from src.core.engine.memory_manager import MemoryManager
+    from src.core.traceability import TraceabilityMatrix
+    _ENGINE = build_engine(MemoryManager(memory_dir), workflow_path=workflow_path, trace=TraceabilityMatrix(trace_path))
+    # Roles are registered lazily; build them all now so jobs start on a warm engine
+    _ENGINE.env.get_roles()
+
+def _run_job(idea, job_dir):
+    """Runs one job on the worker's warm engine inside the job's own directory."""
+    os.makedirs(job_dir, exist_ok=True)
+    os.chdir(job_dir)
+    _ENGINE.env.reset()
+    with open("run.log", "w") as log, redirect_stdout(log):
+        success = _ENGINE.run(idea)
+    return {
+        "success": success,
+        "workspace": job_dir,
+        "messages": [
+            {"role": m.role, "content": m.content, "cause_by": m.cause_by, "sent_from": m.sent_from, "seq": m.seq}
+            for m in _ENGINE.env.message_pool.messages
+        ]
+    }
+
+class QueueFullError(RuntimeError):
+    """Raised by OrchestrationService.submit when the job queue is at capacity."""
+
+class OrchestrationService:
+    """
+    Keeps one pre-built engine per worker process and runs submitted ideas on
+    them. Admission is bounded: at most `workers + queue_size` jobs may be queued
+    or running, after which submit() raises QueueFullError.
+    """
+    def __init__(self, workers=2, queue_size=32, root="workspace/service", memory_dir="memory", workflow_path=WORKFLOW_PATH, max_finished_jobs=1000):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.root = os.path.abspath(root)
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs = OrderedDict()  # {job_id: job dict}, in submission order
+        self._futures = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(os.path.abspath(memory_dir), os.path.abspath(workflow_path), os.path.join(self.root, "traceability.jsonl"))
+        )
+        # Start every worker now so the first jobs don't pay for engine construction
+        for future in [self._pool.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+
+    def submit(self, idea):
+        with self._lock:
+            if self._active >= self.capacity:
+                raise QueueFullError(f"{self._active} jobs queued or running (capacity {self.capacity})")
+            job_id = uuid.uuid4().hex[:12]
+            job = {"job_id": job_id, "idea": idea, "status": "queued", "submitted": datetime.utcnow().isoformat()}
+            self.jobs[job_id] = job
+            self._active += 1
+            future = self._pool.submit(_run_job, idea, os.path.join(self.root, job_id))
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return dict(job)
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self.jobs[job_id]
+            self._futures.pop(job_id, None)
+            self._active -= 1
+            job["finished"] = datetime.utcnow().isoformat()
+            try:
+                job["result"] = future.result()
+                job["status"] = "completed" if job["result"]["success"] else "failed"
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = f"{type(e).__name__}: {e}"
+            self._evict_finished()
+
+    def _evict_finished(self):
+        finished = [jid for jid, job in self.jobs.items() if "finished" in job]
+        for jid in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[jid]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+            future = self._futures.get(job_id)
+        if future is not None and future.running():
+            job["status"] = "running"
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {"status": "ok", "workers": self.workers, "active": self._active, "capacity": self.capacity}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service: OrchestrationService = None
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(200, self.service.stats())
+        if self.path.startswith("/jobs/"):
+            job = self.service.get(self.path[len("/jobs/"):])
+            if job is None:
+                return self._send(404, {"error": "unknown job"})
+            return self._send(200, job)
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            idea = payload["idea"].strip()
+            if not idea:
+                raise ValueError("empty idea")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self._send(400, {"error": "expected a JSON body like {\"idea\": \"...\"}"})
+        try:
+            job = self.service.submit(idea)
+        except QueueFullError as e:
+            return self._send(503, {"error": str(e)}, headers={"Retry-After": "1"})
+        self._send(202, job, headers={"Location": f"/jobs/{job['job_id']}"})
+
+    def log_message(self, format, *args):
+        pass  # Keep request logs out of the console
+
+def make_server(service, host="127.0.0.1", port=8765):
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoDev Studio orchestration service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue-size", type=int, default=32)
+    args = parser.parse_args()
+
+    service = OrchestrationService(workers=args.workers, queue_size=args.queue_size)
+    server = make_server(service, args.host, args.port)
+    print(f"[*] AutoDev service listening on http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import re
+import subprocess
+import sys
+
+# What a local CLI run imports before its first step executes
+STARTUP_MODULES = ("src.main", "src.bootstrap", "src.agents.implementations")
+IMPORTTIME_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(text):
+    """
+    Parses `python -X importtime` output into rows of
+    {"module", "self_us", "cumulative_us", "depth"}, in import order.
+    """
+    rows = []
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({"module": module, "self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": (len(indent) - 1) // 2})
+    return rows
+
+def measure_imports(modules=STARTUP_MODULES):
+    """Imports `modules` in a fresh interpreter with -X importtime and returns the parsed rows."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+def format_report(rows, top=20):
+    total = sum(r["self_us"] for r in rows)
+    project = [r for r in rows if r["module"].split(".")[0] == "src"]
+    lines = [
+        f"[*] Startup imports: {len(rows)} modules, {total / 1000:.1f} ms total, {sum(r['self_us'] for r in project) / 1000:.1f} ms in project modules",
+        "",
+        f"{'self ms':>9} {'cumul ms':>9}  module",
+        "-" * 50,
+    ]
+    for r in sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top]:
+        lines.append(f"{r['self_us'] / 1000:>9.2f} {r['cumulative_us'] / 1000:>9.2f}  {r['module']}")
+    return "\n".join(lines)
+
+def profile_startup(modules=STARTUP_MODULES, top=20):
+    print(format_report(measure_imports(modules), top))
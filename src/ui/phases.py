@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+
+TITLE_RE = re.compile(r"TITLE:\s*(.*)")
+PURPOSE_RE = re.compile(r"PURPOSE:\s*(.*)")
+OUTPUT_RE = re.compile(r"OUTPUT:\s*(.*?)(?=NEXT STEP:)", re.DOTALL)
+
+def parse_clean_output(text):
+    data = {}
+    try:
+        data["title"] = TITLE_RE.search(text).group(1).strip()
+        data["purpose"] = PURPOSE_RE.search(text).group(1).strip()
+        data["output"] = OUTPUT_RE.search(text).group(1).strip()
+    except:
+        data = {"title": "PROCESSING", "purpose": "System is generating content...", "output": text}
+    return data
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU mapping."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class PhaseCache(LRUCache):
+    """
+    Parsed phase cards keyed by content digest. `load` returns the text and is
+    only called on a miss.
+    """
+    def __init__(self, max_entries=2048):
+        super().__init__(max_entries)
+
+    def parse(self, digest, load):
+        data = self.get(digest)
+        if data is None:
+            data = parse_clean_output(load())
+            self.put(digest, data)
+        return data
+
+class ProjectCache(LRUCache):
+    """
+    Size-bounded LRU of finished projects, keyed by (idea, workflow version).
+    Entries are session log references, not message contents.
+    """
+    def __init__(self, max_entries=32):
+        super().__init__(max_entries)
+
+def workflow_version(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
@@ -2,18 +2,18 @@ import streamlit as st
 import sys
 import os
 import json
-import re
+import queue
+import threading
+import uuid
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
-from src.core.engine.sop_executor import SOPExecutor, Environment
-from src.core.engine.executor import Executor
-from src.core.engine.memory_manager import MemoryManager
-from src.agents.implementations import (
-    GuideAgent, PlannerAgent, ArchitectAgent, StructureAgent,
-    BuilderAgent, TesterAgent, ShipperAgent
-)
+from src.bootstrap import build_engine, SESSIONS_DIR, WORKFLOW_PATH
+from src.core.engine.message_log import MessageLog
+from src.core.engine.message_pool import ContentStore, MessagePool
+from src.service.client import ServiceClient
+from src.ui.phases import PhaseCache, ProjectCache, workflow_version
 
 st.set_page_config(page_title="AutoDev Studio", page_icon=None, layout="wide")
 
@@ -72,19 +72,38 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def parse_clean_output(text):
-    data = {}
-    try:
-        data["title"] = re.search(r"TITLE:\s*(.*)", text).group(1).strip()
-        data["purpose"] = re.search(r"PURPOSE:\s*(.*)", text).group(1).strip()
-        data["output"] = re.search(r"OUTPUT:\s*(.*?)(?=NEXT STEP:)", text, re.DOTALL).group(1).strip()
-    except:
-        data = {"title": "PROCESSING", "purpose": "System is generating content...", "output": text}
-    return data
-
-def render_phase(msg):
-    data = parse_clean_output(msg.content)
-    
+@st.cache_resource
+def phase_cache():
+    # Parsed cards are shared by every session of this server process
+    return PhaseCache()
+
+def parse_phase(digest, load):
+    return phase_cache().parse(digest, load)
+
+def phase_of(msg):
+    return parse_phase(msg.digest or ContentStore.digest_of(msg.content), lambda: msg.content)
+
+@st.cache_resource(max_entries=64)
+def open_session(path):
+    # Content is paged in from the mmap on demand; opening never writes to the run's log
+    return MessageLog(path, read_only=True)
+
+def session_phases(project):
+    """Parsed phase cards of a project reference {"log": path, "seqs": [...]}."""
+    log = open_session(project["log"])
+    for seq in project["seqs"]:
+        digest = log.header(seq)["digest"] or ContentStore.digest_of(log.content(seq))
+        yield parse_phase(digest, lambda seq=seq: str(log.content(seq), "utf-8"))
+
+def project_ref(log_path, messages):
+    return {"log": log_path, "seqs": [m.seq for m in messages if m.role != "User"]}
+
+@st.cache_resource
+def project_cache():
+    # Shared by every session of this server process
+    return ProjectCache()
+
+def render_phase(data):
     st.markdown(f"""
     <div class="phase-card">
         <div class="phase-title">{data['title']}</div>
@@ -100,24 +119,44 @@ def render_phase(msg):
     """, unsafe_allow_html=True)
 
 def run_project(idea):
-    env = Environment()
-    executor = Executor()
-    memory = MemoryManager()
-    
-    # 7-Step Roles
-    env.add_role(GuideAgent(memory))
-    env.add_role(PlannerAgent(memory))
-    env.add_role(ArchitectAgent(memory))
-    env.add_role(StructureAgent(memory))
-    env.add_role(BuilderAgent(memory))
-    env.add_role(TesterAgent(memory))
-    env.add_role(ShipperAgent(memory))
-    
-    workflow_path = os.path.join(os.getcwd(), "src/core/sop/workflow.json")
-    sop = SOPExecutor(env, executor, memory, workflow_path=workflow_path)
-    
-    success = sop.run(idea)
-    return env.message_pool.messages if success else []
+    """
+    Runs the pipeline on the orchestration service, where the UI is only a thin
+    client, and keeps the result in a local session log. Returns a project
+    reference, or None on failure.
+    """
+    success, messages = ServiceClient(os.environ["AUTODEV_SERVICE_URL"]).run(idea)
+    if not success:
+        return None
+    path = os.path.join(SESSIONS_DIR, f"service-{uuid.uuid4().hex[:12]}")
+    pool = MessagePool(log=MessageLog(path))
+    for m in messages:
+        pool.publish(m)
+    pool.log.close()
+    return project_ref(path, pool.messages)
+
+def stream_project(idea):
+    """
+    Runs the pipeline on a background thread and yields its events as they happen,
+    so phase cards can be drawn while later steps are still running.
+    """
+    sop = build_engine(sessions=SESSIONS_DIR)
+    events = queue.Queue()
+    sop.subscribe(events.put)
+
+    def worker():
+        try:
+            sop.run(idea)
+        except Exception as e:
+            events.put({"type": "run_finished", "success": False, "error": str(e)})
+
+    threading.Thread(target=worker, daemon=True).start()
+    while True:
+        event = events.get()
+        if event["type"] == "run_finished":
+            event["session"] = sop.session_path
+        yield event
+        if event["type"] == "run_finished":
+            return
 
 # SIDEBAR
 with st.sidebar:
@@ -132,21 +171,51 @@ with st.sidebar:
 # MAIN
 st.markdown("# Start a Project")
 
-if "artifacts" not in st.session_state:
-    st.session_state.artifacts = []
+if "project" not in st.session_state:
+    st.session_state.project = None # {"log": session log path, "seqs": [...]} of the current project
 
 user_input = st.chat_input("What do you want to build?")
 
+streamed = False
 if user_input:
-    st.session_state.artifacts = [] # clear previous
-    with st.status("Initializing Engineering Pipeline...", expanded=True):
-        st.session_state.artifacts = run_project(user_input)
+    st.session_state.project = None # clear previous
+    cache_key = (user_input.strip(), workflow_version(WORKFLOW_PATH))
+    cached = project_cache().get(cache_key)
+    if cached is not None and os.path.isdir(cached["log"]):
+        st.session_state.project = cached
+    elif os.environ.get("AUTODEV_SERVICE_URL"):
+        with st.status("Initializing Engineering Pipeline...", expanded=True):
+            st.session_state.project = run_project(user_input)
+    else:
+        # Render each phase card as soon as its message is published
+        status = st.status("Initializing Engineering Pipeline...", expanded=True)
+        cards = st.container()
+        published = []
+        for event in stream_project(user_input):
+            if event["type"] == "step_started":
+                status.update(label=f"{event['step']}...")
+            elif event["type"] == "validation_failed":
+                status.write(f"{event['step']}: attempt {event['attempt']} did not validate, retrying.")
+            elif event["type"] == "message_published" and event["message"].role != "User":
+                published.append(event["message"])
+                with cards:
+                    render_phase(phase_of(event["message"]))
+            elif event["type"] == "run_finished":
+                success = event["success"]
+                status.update(label="Pipeline complete" if success else "Pipeline failed", state="complete" if success else "error", expanded=False)
+                if success:
+                    st.session_state.project = project_ref(event["session"], published)
+        streamed = True
+    if st.session_state.project:
+        project_cache().put(cache_key, st.session_state.project)
 
 # RENDER PIPELINE
-if st.session_state.artifacts:
-    for msg in st.session_state.artifacts:
-        if msg.role != "User":
-            render_phase(msg)
+# The session only holds log references; reruns read content back from the log
+# and reuse parsed cards by digest, so nothing is re-run
+if st.session_state.project:
+    if not streamed:
+        for data in session_phases(st.session_state.project):
+            render_phase(data)
     
     st.markdown("### Project Complete")
     st.markdown("Ready for deployment.")
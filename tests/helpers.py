@@ -0,0 +1,72 @@
+"""Agents and workflow factories shared by the engine tests."""
+
+import itertools
+import json
+import time
+
+from src.agents.base import Role
+from src.core.engine.message_pool import Message
+from src.core.engine.sop_executor import SOPExecutor, Environment
+
+OUTPUT = "TITLE: {0}\nPURPOSE: test\nOUTPUT: done\nNEXT STEP: next"
+
+
+class StubAgent(Role):
+    """
+    Publishes a Clean Simple output naming the agent; the first `failures`
+    attempts return garbage. Attempts are counted across forks, so `calls`
+    includes speculative attempts.
+    """
+    def __init__(self, name, listens_to, failures=0):
+        super().__init__(name=name, profile=name, goal="", constraints="")
+        self.subscribe({listens_to})
+        self.failures = failures
+        self._counter = itertools.count(1)
+        self._attempts = []
+
+    @property
+    def calls(self):
+        return len(self._attempts)
+
+    def output(self, n):
+        return "garbage" if n <= self.failures else OUTPUT.format(self.name)
+
+    def act(self, message_pool):
+        n = next(self._counter)
+        self._attempts.append(n)
+        output = self.output(n)
+        self.observe_all(message_pool)
+        message_pool.publish(Message(role=self.profile, content=output, sent_from=self.name))
+        return output
+
+
+class ScriptedAgent(StubAgent):
+    """The "Plan" agent whose attempt n sleeps delays[n - 1] and returns garbage if n is in `bad`."""
+    def __init__(self, delays, bad=()):
+        super().__init__("Plan", "User")
+        self.delays = delays
+        self.bad = set(bad)
+
+    def output(self, n):
+        time.sleep(self.delays[n - 1])
+        return "garbage" if n in self.bad else OUTPUT.format(f"attempt {n}")
+
+
+def build(tmp_path, agents, steps, memory=None, **kwargs):
+    """An SOPExecutor over `agents` running the workflow `steps`; `memory` and other `kwargs` go to the executor."""
+    path = tmp_path / "workflow.json"
+    path.write_text(json.dumps(steps))
+    env = Environment()
+    for agent in agents:
+        env.add_role(agent)
+    return SOPExecutor(env, None, memory, workflow_path=str(path), **kwargs)
+
+
+def chain(*names, max_retries=1):
+    """Steps where each agent requires the previous one's output, starting from the User."""
+    previous = "User"
+    steps = []
+    for name in names:
+        steps.append({"step": name, "agent": name, "requires": [previous], "produces": [], "validator": "validate_simplicity", "max_retries": max_retries})
+        previous = name
+    return steps
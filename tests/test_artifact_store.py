@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from src.core.engine.artifact_store import ArtifactStore
+
+
+@pytest.fixture(params=[True, False], ids=["link", "copy"])
+def store(request, tmp_path):
+    return ArtifactStore(root=str(tmp_path / "artifacts"), link=request.param)
+
+
+def test_unchanged_files_are_not_rewritten(store, tmp_path):
+    target = str(tmp_path / "code")
+    first = store.write_tree({"src/main.py": "print(1)\n", "README.md": "hi"}, target)
+    assert first["written"] == ["README.md", "src/main.py"]
+
+    mtime = os.stat(os.path.join(target, "README.md")).st_mtime_ns
+    retry = store.write_tree({"src/main.py": "print(2)\n", "README.md": "hi"}, target)
+    assert retry["written"] == ["src/main.py"] and retry["unchanged"] == ["README.md"]
+    assert os.stat(os.path.join(target, "README.md")).st_mtime_ns == mtime
+    with open(os.path.join(target, "src/main.py")) as f:
+        assert f.read() == "print(2)\n"
+
+
+def test_each_body_is_stored_once(store, tmp_path):
+    store.write_tree({"a.py": "same", "b.py": "same"}, str(tmp_path / "one"))
+    store.write_tree({"c.py": "same"}, str(tmp_path / "two"))
+    objects = [f for _, _, files in os.walk(store.objects_dir) for f in files]
+    assert len(objects) == 1
+
+
+def test_stale_files_are_pruned_and_manifests_diff(store, tmp_path):
+    target = str(tmp_path / "code")
+    old = store.write_tree({"a.py": "1", "b.py": "2"}, target)
+    new = store.write_tree({"a.py": "1", "c.py": "3"}, target)
+    assert new["removed"] == ["b.py"] and not os.path.exists(os.path.join(target, "b.py"))
+    assert store.diff(old["manifest"], new["manifest"]) == {"added": ["c.py"], "removed": ["b.py"], "changed": []}
+
+
+def test_externally_modified_file_is_restored(store, tmp_path):
+    target = str(tmp_path / "code")
+    store.write_tree({"a.py": "original"}, target)
+    path = os.path.join(target, "a.py")
+    os.remove(path)
+    with open(path, "w") as f:
+        f.write("edited")
+    assert store.write_tree({"a.py": "original"}, target)["written"] == ["a.py"]
+    with open(path) as f:
+        assert f.read() == "original"
+
+
+def test_paths_must_stay_inside_target(store, tmp_path):
+    with pytest.raises(ValueError):
+        store.write_tree({"../escape.py": "x"}, str(tmp_path / "code"))
+
+
+def test_copies_are_writable_and_edits_stay_out_of_the_store(tmp_path):
+    store = ArtifactStore(root=str(tmp_path / "artifacts"))
+    target = str(tmp_path / "code")
+    store.write_tree({"a.py": "original"}, target)
+    path = os.path.join(target, "a.py")
+    with open(path, "a") as f:
+        f.write(" edited")
+
+    assert store.get(store.digest_of(b"original")) == b"original"
+    assert store.write_tree({"a.py": "original"}, target)["written"] == ["a.py"]
+    with open(path) as f:
+        assert f.read() == "original"
@@ -0,0 +1,46 @@
+import io
+import json
+import os
+
+from src.batch import read_ideas, run_batch
+
+
+def test_read_ideas_skips_blanks_and_comments():
+    assert list(read_ideas(io.StringIO("# backlog\nA todo app\n\n  A URL shortener  \n"))) == ["A todo app", "A URL shortener"]
+
+
+def test_batch_streams_one_json_line_per_idea(tmp_path):
+    out = io.StringIO()
+    ideas = io.StringIO("A todo app\nA URL shortener\nA markdown converter\n")
+    assert run_batch(ideas, out=out, workers=2, root=str(tmp_path / "batch"), memory_dir=str(tmp_path / "memory"))
+
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(r["index"] for r in results) == [0, 1, 2]
+    assert all(r["success"] for r in results)
+    workspaces = {r["workspace"] for r in results}
+    assert len(workspaces) == 3
+    for workspace in workspaces:
+        assert os.path.exists(os.path.join(workspace, "workspace/generated_code/src/main.py"))
+
+
+def test_jobs_that_fail_before_running_still_report(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    out = io.StringIO()
+    ideas = io.StringIO("A todo app\nA URL shortener\n")
+    assert not run_batch(ideas, out=out, workers=2, root=str(blocker), memory_dir=str(tmp_path / "memory"))
+
+    results = sorted((json.loads(line) for line in out.getvalue().splitlines()), key=lambda r: r["index"])
+    assert [(r["index"], r["success"]) for r in results] == [(0, False), (1, False)]
+    assert all(r["error"].startswith("NotADirectoryError") for r in results)
+
+
+def test_batches_started_together_get_their_own_directories(tmp_path):
+    root = str(tmp_path / "batch")
+    dirs = set()
+    for _ in range(2):
+        out = io.StringIO()
+        assert run_batch(io.StringIO("A todo app\n"), out=out, workers=1, root=root, memory_dir=str(tmp_path / "memory"))
+        dirs.add(os.path.dirname(json.loads(out.getvalue())["workspace"]))
+    assert len(dirs) == 2
+    assert sorted(os.listdir(root)) == sorted(os.path.basename(d) for d in dirs)
@@ -0,0 +1,45 @@
+import glob
+import tempfile
+
+import pytest
+
+from benchmarks.run import CASES, compare, remove_scratch_dirs, time_case
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    # Cases create their scratch directories under the test's tmp_path and are cleaned up like a suite run
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    yield tmp_path
+    remove_scratch_dirs()
+
+
+def report(**timings):
+    return {"results": {name: {"min_s": t, "median_s": t} for name, t in timings.items()}}
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    rows = compare(report(a=1.0, b=1.0, c=1.0, gone=1.0), report(a=1.1, b=1.5, c=0.5, new=1.0), threshold=0.25)
+    assert [(r["case"], r["regression"]) for r in rows] == [("a", False), ("b", True), ("c", False)]
+
+
+def test_time_case_reports_per_call_times():
+    calls = []
+
+    def case(n):
+        return (lambda: calls.append(n)), n
+
+    result = time_case(case, 10, repeat=3, min_sample_s=0)
+    assert result["loops"] == 1 and len(calls) == 4
+    assert result["min_s"] <= result["median_s"]
+    assert result["per_op_us"] == result["min_s"] / 10 * 1e6
+
+
+def test_every_case_runs_at_a_small_size(capsys, scratch):
+    for name, case in CASES.items():
+        op, ops = case(100)
+        op()
+        assert ops > 0, name
+    assert glob.glob(str(scratch / "autodev-bench-*"))
+    remove_scratch_dirs()
+    assert not glob.glob(str(scratch / "autodev-bench-*"))
@@ -0,0 +1,79 @@
+from src.core.engine.checkpoint import CheckpointStore
+from tests.helpers import StubAgent, build, chain
+
+
+def engine(tmp_path, fail_last):
+    plan, ship = StubAgent("Plan", "User"), StubAgent("Ship", "Plan", failures=1 if fail_last else 0)
+    store = CheckpointStore(root=str(tmp_path / "checkpoints"))
+    return build(tmp_path, [plan, ship], chain("Plan", "Ship", max_retries=0), checkpoints=store), plan, ship
+
+
+def test_resume_replays_validated_steps(tmp_path):
+    sop, plan, ship = engine(tmp_path, fail_last=True)
+    assert not sop.run("idea")
+    run_id = sop.run_id
+    run = sop.checkpoints.load_run(run_id)
+    assert run["status"] == "failed" and run["idea"] == "idea"
+    assert list(run["steps"]) == ["Plan"]
+
+    sop, plan, ship = engine(tmp_path, fail_last=False)
+    assert sop.run("idea", run_id=run_id)
+    assert plan.calls == 0 and ship.calls == 1
+    assert [m.role for m in sop.env.message_pool.messages] == ["User", "Plan", "Ship"]
+    assert sop.checkpoints.load_run(run_id)["steps"]["Plan"]["cached"] is True
+
+
+def test_changed_input_invalidates_checkpoint(tmp_path):
+    sop, plan, _ = engine(tmp_path, fail_last=False)
+    assert sop.run("idea")
+    sop, plan, _ = engine(tmp_path, fail_last=False)
+    assert sop.run("another idea")
+    assert plan.calls == 1
+
+
+def test_failed_upstream_attempts_do_not_change_downstream_keys(tmp_path):
+    steps = chain("Plan", "Arch", "Ship", max_retries=0)
+    steps[0]["max_retries"] = 1
+
+    def three_steps(ship_fails):
+        agents = [StubAgent("Plan", "User", failures=1), StubAgent("Arch", "Plan"), StubAgent("Ship", "Arch", failures=1 if ship_fails else 0)]
+        store = CheckpointStore(root=str(tmp_path / "checkpoints"))
+        return build(tmp_path, agents, steps, checkpoints=store), agents
+
+    sop, _ = three_steps(ship_fails=True)
+    assert not sop.run("idea")
+    run_id = sop.run_id
+    sop, (plan, arch, ship) = three_steps(ship_fails=False)
+    assert sop.run("idea", run_id=run_id)
+    assert (plan.calls, arch.calls, ship.calls) == (0, 0, 1)
+
+
+def test_replayed_runs_restore_and_recheck_the_workspace(tmp_path, monkeypatch):
+    from src.bootstrap import build_engine
+    from src.core.engine.memory_manager import MemoryManager
+    from src.core.traceability import TraceabilityMatrix
+
+    monkeypatch.chdir(tmp_path)
+
+    def pipeline():
+        store = CheckpointStore(root="checkpoints")
+        sop = build_engine(MemoryManager("memory"), checkpoints=store, trace=TraceabilityMatrix("trace.jsonl"))
+        events = []
+        sop.subscribe(events.append)
+        return sop, events
+
+    sop, _ = pipeline()
+    assert sop.run("A todo app")
+    main = tmp_path / "workspace/generated_code/src/main.py"
+    main.unlink()
+
+    sop, events = pipeline()
+    assert sop.run("A todo app")
+    assert main.exists()  # Builder's files came back from its manifest
+    assert len([e for e in events if e["type"] == "step_replayed"]) == 7
+
+    # A file Builder does not own survives the restore, so Tester must look again
+    (main.parent / "extra.py").write_text("def broken(:\n")
+    sop, events = pipeline()
+    assert not sop.run("A todo app")
+    assert "Project Validation" not in [e["step"] for e in events if e["type"] == "step_replayed"]
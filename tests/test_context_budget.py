@@ -0,0 +1,61 @@
+import pytest
+
+from src.agents.context_budget import ContextBudget, pack_truncate
+from src.core.engine.message_pool import Message, MessagePool
+from tests.helpers import StubAgent
+
+
+def pool_of(*entries):
+    pool = MessagePool()
+    for role, content in entries:
+        pool.publish(Message(role=role, content=content, sent_from=role))
+    return pool
+
+
+def test_publish_records_utf8_size():
+    pool = pool_of(("Plan", "héllo"), ("Plan", "héllo"))
+    assert [m.size for m in pool.messages] == [6, 6]
+
+
+def test_unbudgeted_role_sees_everything():
+    pool = pool_of(*[("Plan", "x" * 100)] * 5)
+    agent = StubAgent("Build", "Plan")
+    assert len(agent.observe_all(pool)) == 5
+
+
+def test_recent_keeps_newest_suffix():
+    pool = pool_of(("Plan", "a" * 40), ("Plan", "b" * 40), ("Plan", "c" * 40))
+    agent = StubAgent("Build", "Plan")
+    agent.context_budget = ContextBudget(max_tokens=20, strategy="recent")
+    assert [m.content[0] for m in agent.observe_all(pool)] == ["b", "c"]
+    assert len(agent._rc) == 3  # the budget is a view; the role context stays complete
+
+
+def test_latest_per_role_keeps_every_role():
+    pool = pool_of(("Scope", "s" * 50), ("Plan", "a" * 50), ("Plan", "b" * 50), ("Plan", "c" * 50))
+    packed = ContextBudget(max_bytes=120, strategy="latest_per_role").pack(pool.messages)
+    assert [m.content[0] for m in packed] == ["s", "c"]
+
+
+def test_truncate_shortens_older_messages():
+    pool = pool_of(("Plan", "a" * 1000), ("Plan", "b" * 1000), ("Plan", "c" * 300))
+    packed = ContextBudget(max_bytes=1000, strategy="truncate").pack(pool.messages)
+    assert [m.content[0] for m in packed] == ["a", "b", "c"]
+    assert packed[-1] is pool.messages[-1]
+    assert "older bytes truncated" in packed[0].content
+    assert sum(m.size for m in packed) <= 1000
+    assert pool.messages[0].size == 1000  # the published message is untouched
+
+
+def test_truncate_marks_unpublished_messages_with_their_size():
+    messages = [Message(role="Plan", content=c * 1000) for c in "abc"]
+    packed = pack_truncate(messages, 1600)
+    assert [m.content[0] for m in packed] == ["a", "b", "c"]
+    assert all("[... 1000 older bytes truncated]" in m.content for m in packed[:2])
+
+
+def test_unknown_strategy_and_missing_limit_are_rejected():
+    with pytest.raises(ValueError, match="strategy"):
+        ContextBudget(max_bytes=10, strategy="random")
+    with pytest.raises(ValueError):
+        ContextBudget()
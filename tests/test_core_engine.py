@@ -1,11 +1,13 @@
 import pytest
-from engine.sop_executor import SOPExecutor, Environment
-from engine.executor import Executor
-from engine.memory_manager import MemoryManager
+from src.core.engine.sop_executor import SOPExecutor, Environment
+from src.core.engine.executor import Executor
+from src.core.engine.memory_manager import MemoryManager
+from src.bootstrap import ROLES, WORKFLOW_PATH, agent_factory
+from src.core.engine.scheduler import WorkflowError
 
 # Mock classes for lighter testing
 class MockExecutor:
-    def execute(self, cmd):
+    def execute(self, cmd, cwd=None, timeout=None):
         return {"success": True, "stdout": "Test Output", "stderr": "", "code": 0}
 
 def test_environment_initialization():
@@ -13,19 +15,30 @@ def test_environment_initialization():
     assert env.message_pool is not None
     assert len(env.roles) == 0
 
-def test_sop_loading():
+def test_sop_loading(tmp_path):
     # Requires workflow.json to exist
     executor = MockExecutor()
-    memory = MemoryManager()
+    memory = MemoryManager(str(tmp_path))
     env = Environment()
+    for name, class_name in ROLES:
+        env.add_factory(name, agent_factory(class_name, memory))
     try:
-        sop = SOPExecutor(env, executor, memory, workflow_path="sop/workflow.json")
+        sop = SOPExecutor(env, executor, memory, workflow_path=WORKFLOW_PATH)
         assert len(sop.workflow) > 0
     except FileNotFoundError:
         pytest.fail("Workflow JSON not found")
+    assert len(env.roles) == 0  # roles are only built when a step runs
 
-def test_memory_persistence():
-    memory = MemoryManager()
+def test_sop_loading_rejects_unbound_agents():
+    with pytest.raises(WorkflowError, match="Structurer"):
+        env = Environment()
+        for name, class_name in ROLES:
+            if name != "Structurer":
+                env.add_factory(name, agent_factory(class_name, None))
+        SOPExecutor(env, MockExecutor(), None, workflow_path=WORKFLOW_PATH)
+
+def test_memory_persistence(tmp_path):
+    memory = MemoryManager(str(tmp_path))
     assert "feedback" in memory.files
     # Test valid JSON structure (if files exist/are created)
     data = memory.get_all_memory()
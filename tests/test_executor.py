@@ -0,0 +1,55 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.engine.executor import Executor
+
+PY = sys.executable
+
+
+def test_execute_captures_output_and_exit_code():
+    result = Executor().execute(f'{PY} -c "import sys; print(\'out\'); sys.exit(3)"')
+    assert result["stdout"].strip() == "out"
+    assert result["code"] == 3
+    assert not result["success"]
+
+
+def test_timeout_kills_process_group():
+    started = time.perf_counter()
+    result = Executor().execute(f"{PY} -c \"import time; time.sleep(30)\"", timeout=0.5)
+    assert result["timed_out"] and not result["success"]
+    assert time.perf_counter() - started < 10
+
+
+def test_lines_are_streamed_to_callback():
+    lines = []
+    Executor().execute(f'{PY} -c "print(1); print(2)"', on_line=lambda stream, line: lines.append((stream, line)))
+    assert lines == [("stdout", "1"), ("stdout", "2")]
+
+
+def test_async_stream_yields_lines_then_result():
+    async def collect():
+        return [item async for item in Executor().stream(f'{PY} -c "print(\'a\')"')]
+
+    items = asyncio.run(collect())
+    assert items[0] == ("stdout", "a")
+    assert items[-1][0] == "exit" and items[-1][1]["success"]
+
+
+def test_large_output_spills_to_file(tmp_path):
+    executor = Executor(max_output_bytes=1000, spill_dir=str(tmp_path))
+    result = executor.execute(f"{PY} -c \"print('x' * 100000)\"")
+    assert result["truncated"]
+    assert len(result["stdout"]) == 1000
+    with open(result["stdout_path"]) as f:
+        assert len(f.read().strip()) == 100000
+
+
+def test_concurrency_is_bounded_across_threads():
+    executor = Executor(max_concurrency=2)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: executor.execute(f'{PY} -c "import time; time.sleep(0.3)"'), range(4)))
+    assert all(r["success"] for r in results)
+    assert time.perf_counter() - started >= 0.6
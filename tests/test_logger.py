@@ -0,0 +1,40 @@
+import json
+import logging
+
+from src.core.engine.logger import BatchingJsonFileHandler, EnterpriseLogger, JsonFormatter
+
+
+def test_log_event_writes_structured_json(tmp_path):
+    enterprise = EnterpriseLogger("test.structured", log_dir=str(tmp_path))
+    enterprise.logger.propagate = False
+    enterprise.log_event("Builder", "act", "validated", step="Code Generation", attempt=2, duration=0.25)
+    enterprise.close()
+
+    (log_file,) = tmp_path.glob("ade_*.json")
+    record = json.loads(log_file.read_text().splitlines()[-1])
+    assert record["role"] == "Builder"
+    assert record["step"] == "Code Generation"
+    assert record["attempt"] == 2 and record["duration"] == 0.25
+    assert "details" not in record
+    assert record["timestamp"].endswith("+00:00")
+
+
+def test_close_is_safe_to_repeat(tmp_path):
+    enterprise = EnterpriseLogger("test.close", log_dir=str(tmp_path))
+    enterprise.logger.propagate = False
+    assert enterprise.listener.running
+    enterprise.close()
+    assert not enterprise.listener.running
+    enterprise.close()
+
+
+def test_file_handler_batches_and_rotates_by_size(tmp_path):
+    handler = BatchingJsonFileHandler(str(tmp_path), max_bytes=2000, backup_count=2, batch_size=10)
+    handler.setFormatter(JsonFormatter())
+    for i in range(100):
+        handler.handle(logging.makeLogRecord({"msg": f"record {i}", "levelname": "INFO"}))
+    handler.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert len(files) == 3  # current file plus two backups
+    assert all(p.stat().st_size <= 2000 for p in tmp_path.iterdir())
@@ -0,0 +1,128 @@
+import heapq
+import json
+import math
+import multiprocessing
+import random
+
+from src.core.engine import memory_manager
+from src.core.engine.memory_manager import MemoryManager
+from src.core.engine.recall_index import InvertedIndex, tokenize
+from tests.helpers import StubAgent, build, chain
+
+
+def _write_failures(memory_dir, start, count):
+    memory = MemoryManager(memory_dir)
+    for i in range(start, start + count):
+        memory.add_failure({"id": i, "error": "x" * 200})
+
+
+def test_appends_are_cached_and_visible_to_other_instances(tmp_path):
+    first = MemoryManager(str(tmp_path))
+    second = MemoryManager(str(tmp_path))
+    first.add_failure({"id": 1})
+    first.add_pattern("modular monolith")
+    assert second.counts() == {"feedback": 0, "failures": 1, "patterns": 1}
+    second.add_failure({"id": 2})
+    assert [f["id"] for f in first.get_all_memory()["failures"]] == [1, 2]
+    assert (tmp_path / "past_failures.jsonl").read_text().count("\n") == 2
+
+
+def test_legacy_json_arrays_are_migrated(tmp_path):
+    (tmp_path / "past_failures.json").write_text(json.dumps([{"id": 1}, {"id": 2}], indent=2))
+    memory = MemoryManager(str(tmp_path))
+    memory.add_failure({"id": 3})
+    assert [f["id"] for f in memory.get_all_memory()["failures"]] == [1, 2, 3]
+
+
+def test_concurrent_processes_do_not_interleave(tmp_path):
+    procs = [multiprocessing.Process(target=_write_failures, args=(str(tmp_path), i * 100, 100)) for i in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    failures = MemoryManager(str(tmp_path)).get_all_memory()["failures"]
+    assert sorted(f["id"] for f in failures) == list(range(400))
+
+
+def test_recall_ranks_relevant_records(tmp_path):
+    memory = MemoryManager(str(tmp_path))
+    memory.add_failure({"step": "Code Generation", "error": "ImportError in generated flask app"})
+    memory.add_failure({"step": "Delivery", "error": "missing README"})
+    memory.add_pattern("Use a modular monolith for small CLI tools")
+    memory.add_feedback("Flask apps need a requirements.txt")
+
+    assert memory.recall("flask import error", kind="failures", k=1)[0]["step"] == "Code Generation"
+    assert len(memory.recall("flask", k=5)) == 2
+    assert memory.recall("kubernetes") == []
+
+    # Records appended by another instance are indexed on the next recall
+    MemoryManager(str(tmp_path)).add_pattern("Prefer the standard library for CLI parsing")
+    assert memory.recall("standard library", kind="patterns") == ["Prefer the standard library for CLI parsing"]
+
+
+def test_counting_does_not_build_the_recall_index(tmp_path):
+    memory = MemoryManager(str(tmp_path))
+    memory.add_failure({"step": "Delivery", "error": "missing README"})
+    assert memory.counts()["failures"] == 1
+    assert memory._cache["failures"]["index"] is None
+    assert memory.recall("readme", kind="failures") == [{"step": "Delivery", "error": "missing README"}]
+
+
+def test_recall_index_is_saved_and_reused(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_manager, "PERSIST_AFTER", 10)
+    memory = MemoryManager(str(tmp_path))
+    for i in range(12):
+        memory.add_failure({"id": i, "error": f"timeout in step {i}"})
+    memory.recall("timeout", kind="failures")
+    assert (tmp_path / "past_failures.index").exists()
+
+    memory.add_failure({"id": 12, "error": "flask import"})
+    fresh = MemoryManager(str(tmp_path))
+    assert fresh.recall("flask", kind="failures") == [{"id": 12, "error": "flask import"}]
+    assert fresh._cache["failures"]["index"]._frozen  # loaded from disk; untouched terms were never rebuilt
+    assert sorted(r["id"] for r in fresh.recall("timeout step", kind="failures", k=20)) == list(range(12))
+
+    # A rewritten file no longer matches the saved index
+    (tmp_path / "past_failures.jsonl").write_text(json.dumps({"id": 99, "error": "kubernetes"}) + "\n")
+    assert MemoryManager(str(tmp_path)).recall("kubernetes", kind="failures") == [{"id": 99, "error": "kubernetes"}]
+
+
+def test_pruned_search_matches_a_full_scan():
+    rng = random.Random(7)
+    words = ["flask", "import", "error", "missing", "module", "timeout", "schema", "readme", "tests", "json"]
+    index = InvertedIndex()
+    for doc_id in range(3000):
+        # Few distinct lengths and term counts, so many documents tie
+        index.add(doc_id, " ".join(rng.choice(words) for _ in range(rng.randint(2, 8))))
+
+    def full_scan(query, k):
+        n, avg_length, scores = len(index), index.total_length / len(index), {}
+        for term in sorted(set(tokenize(query))):
+            postings = index.postings.get(term)
+            if postings is None:
+                continue
+            df = len(postings.docs)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc_id, tf in zip(postings.docs, postings.tfs):
+                scores[doc_id] = scores.get(doc_id, 0.0) + index._weight(idf, tf, index.doc_lengths[doc_id], avg_length)
+        return heapq.nlargest(k, ((score, doc_id) for doc_id, score in scores.items()))
+
+    for query in ["flask", "flask import error", "missing module tests json", "timeout timeout readme", "kubernetes"]:
+        for k in (1, 5, 20):
+            assert index.search(query, k) == full_scan(query, k)
+
+
+def test_failed_steps_are_recalled_by_later_runs(tmp_path):
+    from src.agents.implementations import GuideAgent
+
+    memory = MemoryManager(str(tmp_path / "memory"))
+    steps = chain("Guide", "Plan", max_retries=0)
+    steps[0]["agent"] = "Guide"
+    sop = build(tmp_path, [GuideAgent(memory), StubAgent("Plan", "Project Understanding", failures=1)], steps, memory=memory)
+    assert not sop.run("A flask todo app")
+    assert memory.get_all_memory()["failures"][0]["step"] == "Plan"
+
+    sop = build(tmp_path, [GuideAgent(memory), StubAgent("Plan", "Project Understanding")], steps, memory=memory)
+    assert sop.run("A flask blog")
+    guide = sop.env.message_pool.messages[1].content
+    assert "Past Failures: 1" in guide and "Lesson:" in guide and "flask todo" in guide
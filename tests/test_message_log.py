@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from src.core.engine.message_log import MessageLog
+from src.core.engine.message_pool import Message, MessagePool
+from tests.helpers import StubAgent, build, chain
+
+
+def publish(pool, n, start=0):
+    for i in range(start, start + n):
+        pool.publish(Message(role="Coder" if i % 2 else "User", content=f"message {i} " + "x" * 40, cause_by="Step", sent_from="Coder"))
+
+
+def test_reads_across_segments(tmp_path):
+    log = MessageLog(str(tmp_path / "s"), segment_bytes=256)
+    pool = MessagePool(log=log)
+    publish(pool, 20)
+
+    assert len([n for n in os.listdir(tmp_path / "s") if n.endswith(".log")]) > 1
+    assert len(log) == 20
+    message = log.read(13)
+    assert (message.seq, message.role, message.content) == (13, "Coder", "message 13 " + "x" * 40)
+    assert message.digest == pool.messages[13].digest
+    assert log.header(13)["size"] == pool.messages[13].size
+    assert [m.content for m in log] == [m.content for m in pool.messages]
+    with pytest.raises(IndexError):
+        log.read(20)
+
+
+def test_content_is_a_view_of_the_mapped_log(tmp_path):
+    log = MessageLog(str(tmp_path / "s"))
+    MessagePool(log=log).publish(Message(role="Coder", content="héllo"))
+    view = log.content(0)
+    assert isinstance(view, memoryview) and view.readonly
+    assert str(view, "utf-8") == "héllo"
+
+
+def test_pool_reopens_and_continues_the_sequence(tmp_path):
+    path = str(tmp_path / "s")
+    pool = MessagePool(log=MessageLog(path, segment_bytes=256))
+    publish(pool, 5)
+    pool.log.close()
+
+    reopened = MessagePool(log=MessageLog(path, segment_bytes=256))
+    assert [m.content for m in reopened.messages] == [m.content for m in pool.messages]
+    assert reopened.find_latest("Coder").content == pool.find_latest("Coder").content
+    publish(reopened, 1, start=5)
+    assert reopened.messages[-1].seq == 5 and len(reopened.log) == 6
+
+
+def test_torn_trailing_record_is_dropped(tmp_path):
+    path = str(tmp_path / "s")
+    log = MessageLog(path)
+    publish(MessagePool(log=log), 3)
+    log.close()
+    segment = os.path.join(path, f"{0:020d}.log")
+    os.truncate(segment, os.path.getsize(segment) - 7)  # crash mid-write of the third record
+
+    recovered = MessageLog(path)
+    assert len(recovered) == 2
+    assert recovered.read(1).content.startswith("message 1 ")
+    pool = MessagePool(log=recovered)
+    publish(pool, 1, start=2)
+    assert len(MessageLog(path)) == 3
+
+
+def test_read_only_log_skips_recovery(tmp_path):
+    path = str(tmp_path / "s")
+    log = MessageLog(path)
+    publish(MessagePool(log=log), 3)
+    log.close()
+    segment = os.path.join(path, f"{0:020d}.log")
+    os.truncate(segment, os.path.getsize(segment) - 7)
+    size = os.path.getsize(segment)
+    with open(segment[:-len(".log")] + ".idx", "rb") as f:
+        index = f.read()
+
+    reader = MessageLog(path, read_only=True)
+    assert len(reader) == 2 and reader.read(1).content.startswith("message 1 ")
+    with pytest.raises(ValueError, match="read-only"):
+        reader.append(Message(role="Coder", content="x"))
+    assert os.path.getsize(segment) == size
+    with open(segment[:-len(".log")] + ".idx", "rb") as f:
+        assert f.read() == index
+    with pytest.raises(FileNotFoundError):
+        MessageLog(str(tmp_path / "missing"), read_only=True)
+
+
+def test_append_rejects_out_of_order_seq(tmp_path):
+    log = MessageLog(str(tmp_path / "s"))
+    message = Message(role="Coder", content="late")
+    message.seq = 4
+    with pytest.raises(ValueError):
+        log.append(message)
+
+
+def test_each_run_gets_its_own_session_log(tmp_path):
+    sop = build(tmp_path, [StubAgent("Plan", "User")], chain("Plan"))
+    sop.sessions = str(tmp_path / "sessions")
+    sop.run_id = "demo"
+    assert sop.run("idea")
+    first = sop.session_path
+    assert sop.run("idea")
+
+    assert first.endswith("demo") and sop.session_path == first + ".1"
+    assert [m.role for m in MessageLog(first)] == ["User", "Plan"]
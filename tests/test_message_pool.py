@@ -0,0 +1,87 @@
+import sys
+
+from src.agents.base import Role
+from src.core.engine.message_pool import ContentStore, Message, MessagePool
+
+
+class Listener(Role):
+    def __init__(self, roles):
+        super().__init__(name="Listener", profile="Listener", goal="", constraints="")
+        self.subscribe(roles)
+
+    def act(self, message_pool):
+        return ""
+
+
+def filled_pool():
+    pool = MessagePool()
+    for i, role in enumerate(["User", "Scope", "Code", "Scope", "Tests", "Code"]):
+        pool.publish(Message(role=role, content=f"{role}-{i}"))
+    return pool
+
+
+def test_publish_assigns_monotonic_sequence():
+    pool = filled_pool()
+    assert [m.seq for m in pool.messages] == list(range(6))
+
+
+def test_fetch_filters_by_subscription_in_publish_order():
+    pool = filled_pool()
+    assert [m.content for m in pool.fetch({"Scope", "Code"})] == ["Scope-1", "Code-2", "Scope-3", "Code-5"]
+    assert [m.content for m in pool.fetch("Tests")] == ["Tests-4"]
+    assert pool.fetch({"Missing"}) == []
+    assert len(pool.fetch()) == 6
+
+
+def test_observe_uses_subscription_index():
+    pool = filled_pool()
+    assert [m.content for m in Listener({"User", "Tests"}).observe(pool)] == ["User-0", "Tests-4"]
+
+
+def test_find_latest():
+    pool = filled_pool()
+    assert pool.find_latest("Code").content == "Code-5"
+    assert pool.find_latest("Missing") is None
+
+
+def test_observe_returns_only_new_messages_and_accumulates_context():
+    pool = filled_pool()
+    listener = Listener({"Scope"})
+    assert [m.content for m in listener.observe(pool)] == ["Scope-1", "Scope-3"]
+    assert listener.observe(pool) == []
+    pool.publish(Message(role="Scope", content="Scope-6"))
+    assert [m.content for m in listener.observe(pool)] == ["Scope-6"]
+    assert [m.content for m in listener.observe_all(pool)] == ["Scope-1", "Scope-3", "Scope-6"]
+
+
+def test_observe_resets_for_new_pool_and_new_subscriptions():
+    pool = filled_pool()
+    listener = Listener({"Scope"})
+    listener.observe(pool)
+    listener.subscribe({"User"})
+    assert [m.content for m in listener.observe(pool)] == ["User-0", "Scope-1", "Scope-3"]
+    assert [m.content for m in listener.observe(filled_pool())] == ["User-0", "Scope-1", "Scope-3"]
+
+
+def test_identical_contents_share_storage():
+    pool = MessagePool()
+    for _ in range(3):
+        pool.publish(Message(role="Code", content="TITLE: Code\n" + "x" * 10_000))
+    first, second, _ = pool.messages
+    assert first.content is second.content
+    assert first.digest == second.digest
+    usage = pool.memory_usage()
+    assert usage["unique_contents"] == 1
+    assert usage["logical_content_bytes"] >= 3 * usage["content_bytes"]
+    assert not hasattr(first, "__dict__")
+
+
+def test_content_store_counts_each_body_once():
+    store = ContentStore()
+    body = "TITLE: Code\n" + "x" * 1000
+    digest, canonical, size = store.intern(body)
+    again = store.intern("".join(["TITLE: Code\n", "x" * 1000]))
+    assert again == (digest, canonical, size) and again[1] is canonical
+    assert size == len(body.encode("utf-8")) and digest == ContentStore.digest_of(body) == ContentStore.digest_of(body.encode("utf-8"))
+    assert len(store) == 1 and store.unique_bytes == sys.getsizeof(canonical)
+    assert store.get(digest) is canonical
@@ -0,0 +1,42 @@
+from src.ui.phases import PhaseCache, ProjectCache, workflow_version
+
+PHASE = "TITLE: Plan\nPURPOSE: Scope the work\nOUTPUT: Three steps\nNEXT STEP: Build"
+
+
+def test_phases_are_parsed_once_per_digest():
+    cache = PhaseCache()
+    loads = []
+
+    def load(text):
+        return lambda: loads.append(text) or text
+
+    first = cache.parse("d1", load(PHASE))
+    assert cache.parse("d1", load(PHASE)) is first
+    assert loads == [PHASE]
+    assert first == {"title": "Plan", "purpose": "Scope the work", "output": "Three steps"}
+
+    # New content arrives under a new digest and is parsed afresh
+    edited = PHASE.replace("Three", "Four")
+    assert cache.parse("d2", load(edited))["output"] == "Four steps"
+    assert loads == [PHASE, edited]
+
+
+def test_project_cache_misses_once_the_workflow_changes(tmp_path):
+    workflow = tmp_path / "workflow.yaml"
+    workflow.write_text("steps: [plan]\n")
+    cache = ProjectCache(max_entries=2)
+    project = {"log": "session.log", "seqs": [1, 2]}
+    cache.put(("A todo app", workflow_version(workflow)), project)
+    assert cache.get(("A todo app", workflow_version(workflow))) is project
+
+    workflow.write_text("steps: [plan, build]\n")
+    assert cache.get(("A todo app", workflow_version(workflow))) is None
+
+
+def test_project_cache_evicts_least_recently_used():
+    cache = ProjectCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
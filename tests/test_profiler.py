@@ -0,0 +1,49 @@
+from src.core.engine.profiler import Profiler, profiler
+from tests.helpers import OUTPUT, StubAgent, build, chain
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.span("step", "step") as span:
+        span.set(attempts=1)
+    assert profiler.spans == []
+
+
+def test_spans_export_chrome_trace_and_summary(tmp_path):
+    profiler = Profiler(enabled=True, trace_memory=True)
+    try:
+        with profiler.span("Code Generation", "step") as step:
+            with profiler.span("Builder.act", "agent"):
+                blob = bytearray(512 * 1024)
+            step.set(attempts=2, bytes_published=100)
+        del blob
+    finally:
+        profiler.disable()
+
+    trace = profiler.to_chrome_trace()
+    names = [e["name"] for e in trace["traceEvents"]]
+    assert names == ["Builder.act", "Code Generation"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in trace["traceEvents"])
+
+    rows = {r["name"]: r for r in profiler.summary()}
+    assert rows["Code Generation"]["attempts"] == 2
+    assert rows["Code Generation"]["bytes"] == 100
+    assert rows["Builder.act"]["peak_kb"] >= 500
+    assert rows["Code Generation"]["peak_kb"] >= rows["Builder.act"]["peak_kb"]
+    assert "Code Generation" in profiler.format_summary()
+    profiler.export_chrome_trace(str(tmp_path / "trace.json"))
+    assert (tmp_path / "trace.json").exists()
+
+
+def test_step_span_counts_bytes_of_every_attempt(tmp_path):
+    sop = build(tmp_path, [StubAgent("Plan", "User", failures=1)], chain("Plan"))
+    profiler.reset()
+    profiler.enable()
+    try:
+        assert sop.run("idea")
+    finally:
+        profiler.disable()
+    rows = {r["name"]: r for r in profiler.summary()}
+    profiler.reset()
+    assert rows["Plan"]["attempts"] == 2
+    assert rows["Plan"]["bytes"] == len("garbage") + len(OUTPUT.format("Plan").encode("utf-8"))
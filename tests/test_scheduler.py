@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+from src.core.engine.scheduler import StepGraph, DAGScheduler, WorkflowError
+
+
+def step(name, requires, produces=()):
+    return {"step": name, "agent": name, "requires": list(requires), "produces": list(produces), "validator": "validate_simplicity"}
+
+
+def test_graph_resolves_steps_and_artifacts():
+    graph = StepGraph([
+        step("Scope", ["User"], ["ScopeDoc"]),
+        step("Code", ["ScopeDoc"]),
+        step("Docs", ["Code"]),
+        step("Tests", ["Code"]),
+    ])
+    assert graph.dependencies["Code"] == {"Scope"}
+    assert graph.dependents["Code"] == {"Docs", "Tests"}
+    assert graph.topological_order() == ["Scope", "Code", "Docs", "Tests"]
+    assert graph.width() == 2
+
+
+def test_graph_rejects_missing_producer():
+    with pytest.raises(WorkflowError, match="no step produces"):
+        StepGraph([step("Code", ["Design"])])
+
+
+def test_graph_rejects_cycle():
+    with pytest.raises(WorkflowError, match="Cycle"):
+        StepGraph([step("A", ["B"]), step("B", ["A"])])
+
+
+def test_scheduler_runs_siblings_concurrently():
+    graph = StepGraph([
+        step("Code", ["User"]),
+        step("Docs", ["Code"]),
+        step("Tests", ["Code"]),
+        step("Ship", ["Docs", "Tests"]),
+    ])
+    barrier = threading.Barrier(2, timeout=5)
+    finished = []
+
+    def run_step(s):
+        if s["step"] in ("Docs", "Tests"):
+            barrier.wait()  # deadlocks unless both siblings run at once
+        finished.append(s["step"])
+        return True
+
+    assert DAGScheduler(graph, max_workers=4).run(run_step)
+    assert finished[0] == "Code" and finished[-1] == "Ship"
+
+
+def test_scheduler_stops_after_failure():
+    graph = StepGraph([step("A", ["User"]), step("B", ["A"]), step("C", ["B"])])
+    ran = []
+
+    def run_step(s):
+        ran.append(s["step"])
+        return s["step"] != "B"
+
+    assert not DAGScheduler(graph).run(run_step)
+    assert ran == ["A", "B"]
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+from src.service.client import ServiceClient
+from src.service.server import OrchestrationService, QueueFullError, make_server
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = OrchestrationService(workers=1, queue_size=0, root=str(tmp_path / "service"), memory_dir=str(tmp_path / "memory"))
+    yield service
+    service.shutdown()
+
+
+def test_jobs_run_on_warm_workers_over_http(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = ServiceClient(f"http://127.0.0.1:{server.server_address[1]}")
+        for idea in ("A todo app", "A URL shortener"):
+            success, messages = client.run(idea, timeout=30)
+            assert success
+            assert messages[0].content == idea
+            assert messages[-1].role == "Delivery"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_submit_applies_backpressure(service):
+    job = service.submit("A todo app")
+    with pytest.raises(QueueFullError):
+        service.submit("A URL shortener")
+    assert service.get(job["job_id"])["idea"] == "A todo app"
+    assert service.get("missing") is None
+
+
+def test_worker_initializer_builds_every_role(tmp_path, monkeypatch):
+    from src.service import server
+    monkeypatch.setattr(server, "_ENGINE", None)
+    server._init_worker(str(tmp_path / "memory"), server.WORKFLOW_PATH, str(tmp_path / "trace.json"))
+    env = server._ENGINE.env
+    assert env.role_names() and sorted(env.roles) == sorted(env.role_names())
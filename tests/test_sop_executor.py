@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from src.core.engine.sop_executor import SOPExecutor, Environment
+from tests.helpers import StubAgent, build, chain
+
+
+def test_run_emits_event_stream(tmp_path):
+    sop = build(tmp_path, [StubAgent("Plan", "User", failures=1), StubAgent("Ship", "Plan")], chain("Plan", "Ship"))
+    events = []
+    sop.subscribe(events.append)
+    assert sop.run("idea")
+
+    types = [e["type"] for e in events]
+    assert types[0] == "run_started" and types[-1] == "run_finished"
+    assert events[-1]["success"] is True
+    plan = [(e["type"], e.get("attempt")) for e in events if e.get("step") == "Plan"]
+    assert plan == [("step_started", None), ("attempt", 1), ("validation_failed", 1), ("attempt", 2), ("validated", 2)]
+    published = [e["message"].role for e in events if e["type"] == "message_published"]
+    assert published == ["User", "Plan", "Plan", "Ship"]
+
+
+def test_failed_step_is_reported(tmp_path):
+    sop = build(tmp_path, [StubAgent("Plan", "User", failures=5)], chain("Plan", max_retries=0))
+    events = []
+    sop.subscribe(events.append)
+    assert not sop.run("idea")
+    failed = next(e for e in events if e["type"] == "step_failed")
+    assert failed["step"] == "Plan" and failed["reason"] == "validation"
+    assert events[-1]["success"] is False
+
+
+def test_registry_is_ordered_lazy_and_rejects_duplicates(tmp_path):
+    built = []
+
+    def factory(name, listens_to):
+        def make():
+            built.append(name)
+            return StubAgent(name, listens_to)
+        return make
+
+    env = Environment()
+    env.add_factory("Ship", factory("Ship", "Plan"))
+    env.add_factory("Plan", factory("Plan", "User"), profile="Planning")
+    env.add_factory("Unused", factory("Unused", "User"))
+    with pytest.raises(ValueError, match="Duplicate"):
+        env.add_role(StubAgent("Plan", "User"))
+
+    assert env.get_role("Planning").name == "Plan" and built == ["Plan"]
+    path = tmp_path / "workflow.json"
+    path.write_text(json.dumps(chain("Plan", "Ship")))
+    assert SOPExecutor(env, None, None, workflow_path=str(path)).run("idea")
+    assert built == ["Plan", "Ship"]
+    assert [r.name for r in env.get_roles()] == ["Ship", "Plan", "Unused"]
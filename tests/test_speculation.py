@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from src.core.engine.scheduler import WorkflowError
+from src.core.engine.speculation import SpeculationPolicy
+from tests.helpers import OUTPUT, ScriptedAgent, build, chain
+
+
+def engine(tmp_path, agent, speculate, max_retries=2):
+    steps = chain("Plan", max_retries=max_retries)
+    steps[0]["speculate"] = speculate
+    sop = build(tmp_path, [agent], steps)
+    events = []
+    sop.subscribe(events.append)
+    return sop, events
+
+
+class FileWriter(ScriptedAgent):
+    """Writes its attempt's output to a shared file once its delay has passed."""
+    writes_workspace = True
+
+    def __init__(self, delays, path):
+        super().__init__(delays)
+        self.path = path
+
+    def output(self, n):
+        output = super().output(n)
+        self.path.write_text(output)
+        return output
+
+
+def published(sop):
+    return [m.content for m in sop.env.message_pool.messages if m.role == "Plan"]
+
+
+def test_parallel_attempts_publish_only_the_first_valid_output(tmp_path):
+    sop, events = engine(tmp_path, ScriptedAgent([0.3, 0.01, 0.3]), {"parallel": 3})
+    assert sop.run("idea")
+    assert published(sop) == [OUTPUT.format("attempt 2")]
+    time.sleep(0.4)  # the losers finish later and must still not publish
+    assert len(published(sop)) == 1
+    assert len([e for e in events if e["type"] == "attempt_cancelled"]) == 2
+
+
+def test_failed_attempts_are_replaced_until_the_budget_is_spent(tmp_path):
+    sop, events = engine(tmp_path, ScriptedAgent([0, 0, 0], bad={1, 2}), {"parallel": 2})
+    assert sop.run("idea")
+    assert published(sop) == [OUTPUT.format("attempt 3")]
+
+    sop, _ = engine(tmp_path, ScriptedAgent([0, 0, 0], bad={1, 2, 3}), {"parallel": 2})
+    assert not sop.run("idea") and published(sop) == []
+
+
+def test_slow_attempt_is_hedged(tmp_path):
+    sop, events = engine(tmp_path, ScriptedAgent([1.0, 0.01]), {"hedge_after": 0.05}, max_retries=1)
+    started = time.perf_counter()
+    assert sop.run("idea")
+    assert time.perf_counter() - started < 0.8
+    assert [e["hedge"] for e in events if e["type"] == "attempt"] == [False, True]
+    assert published(sop) == [OUTPUT.format("attempt 2")]
+
+
+def test_hedge_delay_follows_observed_latency():
+    policy = SpeculationPolicy("Plan", {"hedge_percentile": 90, "hedge_after": 5, "min_samples": 3})
+    assert policy.hedge_delay() == 5
+    for seconds in (0.1, 0.2, 0.3, 0.4, 2.0):
+        policy.record(seconds)
+    assert policy.hedge_delay() == 2.0 and policy.width() == 1 and policy.parallel == 2
+
+
+def test_invalid_speculate_options_are_rejected(tmp_path):
+    with pytest.raises(WorkflowError, match="parallel"):
+        engine(tmp_path, ScriptedAgent([0]), {"parallel": 0})
+    with pytest.raises(WorkflowError, match="unknown"):
+        engine(tmp_path, ScriptedAgent([0]), {"hedge": True})
+
+
+def test_agents_writing_the_workspace_are_not_speculated(tmp_path):
+    path = tmp_path / "main.py"
+    # Speculated, the fast second attempt would win and the slow first one overwrite its file afterwards
+    sop, events = engine(tmp_path, FileWriter([0.2, 0.01], path), {"parallel": 2})
+    assert sop.run("idea")
+    time.sleep(0.3)
+    assert published(sop) == [OUTPUT.format("attempt 1")] == [path.read_text()]
+    assert not any(e.get("speculative") for e in events if e["type"] == "attempt")
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+from src.startup import ROOT, format_report, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       455 |        455 |     json.encoder
+import time:       193 |      10954 |   json
+import time:       755 |      12026 | src.core.sop.validators
+"""
+
+
+def test_parse_importtime():
+    rows = parse_importtime(SAMPLE)
+    assert [(r["module"], r["depth"]) for r in rows] == [("json.encoder", 2), ("json", 1), ("src.core.sop.validators", 0)]
+    assert rows[2]["cumulative_us"] == 12026
+    report = format_report(rows, top=2)
+    assert "3 modules" in report and "0.8 ms in project modules" in report
+
+
+def test_cli_and_engine_imports_are_side_effect_free():
+    code = (
+        "import sys, threading; import src.main, src.bootstrap, src.core.engine.logger; "
+        "print(threading.active_count(), 'asyncio' in sys.modules, 'src.agents.implementations' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+    assert out == ["1", "False", "False"]
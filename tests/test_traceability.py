@@ -0,0 +1,59 @@
+import time
+
+from src.core.traceability import TraceabilityMatrix
+from tests.helpers import StubAgent, build, chain
+
+
+def test_lineage_follows_every_parent_and_survives_cycles():
+    trace = TraceabilityMatrix()
+    trace.link("User", "Scope")
+    trace.link("Scope", "Design")
+    trace.link("Research", "Design")
+    trace.link("Design", "Code")
+    trace.link("Code", "Scope", "feedback")  # cycle
+
+    assert trace.ancestors("Code") == ["Design", "Scope", "Research", "User"]
+    assert [l["upstream"] for l in trace.get_lineage("Design")] == ["Scope", "Research", "User", "Code", "Design"]
+    assert trace.descendants("Scope") == ["Design", "Code"]
+    assert trace.link("User", "Scope") is False and len(trace) == 5
+
+
+def test_impact_is_ordered_after_upstreams():
+    trace = TraceabilityMatrix()
+    for up, down in [("Scope", "Design"), ("Scope", "Tasks"), ("Design", "Tasks"), ("Tasks", "Code"), ("Design", "Code")]:
+        trace.link(up, down)
+    assert trace.impact("Scope") == ["Design", "Tasks", "Code"]
+
+
+def test_impact_on_large_graph_is_fast():
+    trace = TraceabilityMatrix()
+    for i in range(1, 30000):
+        trace.link(f"a{(i - 1) // 3}", f"a{i}")
+        trace.link(f"a{i // 2}", f"a{i}", "uses")
+    started = time.perf_counter()
+    affected = trace.impact("a0")
+    assert len(affected) == 29999
+    assert time.perf_counter() - started < 0.5
+
+
+def test_links_persist_and_reload(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    trace = TraceabilityMatrix(path)
+    trace.link("User", "Scope")
+    trace.link("Scope", "Design")
+    with open(path, "a") as f:
+        f.write('{"upstream": "Design", "downs')  # torn write
+
+    reloaded = TraceabilityMatrix(path)
+    assert reloaded.ancestors("Design") == ["Scope", "User"]
+    assert reloaded.link("Scope", "Design") is False
+
+
+def test_sop_run_records_workflow_links(tmp_path):
+    steps = chain("Plan", "Ship")
+    steps[0]["produces"] = ["Scope"]
+    sop = build(tmp_path, [StubAgent("Plan", "User"), StubAgent("Ship", "Plan")], steps)
+    sop.trace = TraceabilityMatrix()
+    assert sop.run("idea")
+    assert sop.trace.impact("User") == ["Plan", "Scope", "Ship"]
+    assert sop.trace.get_lineage("Ship")[0]["type"] == "requires"
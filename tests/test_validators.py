@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from src.core.sop.validators import SOPValidators, TagScanner, extract_json_object, get_validator, resolve_validators
+
+
+def test_simplicity_reports_missing_tags():
+    result = SOPValidators.validate_simplicity("TITLE: x\nPURPOSE: y\nOUTPUT: z")
+    assert not result
+    assert result.diagnostics == ["missing 'NEXT STEP:'"]
+    assert SOPValidators.validate_simplicity("TITLE: PURPOSE: OUTPUT: NEXT STEP:")
+
+
+def test_tag_scanner_counts_tags_contained_in_longer_matches():
+    assert TagScanner(["Goal", "Goals", "Risks"]).missing("Goals and Risks") == []
+    assert SOPValidators.validate_prd("Goals: ship it. Requirements: none")
+
+
+def test_extract_json_object_is_brace_balanced():
+    text = 'Design {"modules": ["core"], "note": "a } in a string"} trailing {"other": 1}'
+    data, diagnostics = extract_json_object(text)
+    assert data == {"modules": ["core"], "note": "a } in a string"}
+    assert diagnostics == []
+
+
+def test_extract_json_object_skips_invalid_candidates_and_bounds_scan():
+    data, diagnostics = extract_json_object('{placeholder} then {"files": []}')
+    assert data == {"files": []} and len(diagnostics) == 1
+    huge = '{"modules": [' + ", ".join(["1"] * 100_000) + "]}"
+    data, diagnostics = extract_json_object(huge, max_chars=1000)
+    assert data is None and "unbalanced" in diagnostics[0]
+
+
+def test_validate_design():
+    assert SOPValidators.validate_design("Here you go:\n" + json.dumps({"files": ["a.py"]}))
+    result = SOPValidators.validate_design('{"layers": 3}')
+    assert not result and "none of" in result.diagnostics[-1]
+
+
+def test_unknown_validators_are_rejected():
+    with pytest.raises(ValueError, match="validate_magic"):
+        get_validator("validate_magic")
+    with pytest.raises(ValueError, match="step 'Build'"):
+        resolve_validators([{"step": "Build", "validator": "validate_magic"}])
+    assert resolve_validators([{"step": "Build", "validator": "validate_code"}])["Build"] is SOPValidators.validate_code
+
+
+def test_validate_checks_fails_on_a_failed_check():
+    report = "TITLE: Project Validation\nPURPOSE: p\nOUTPUT: **Syntax Check:** Passed\n**Import Check:** {0}\nNEXT STEP: n"
+    assert SOPValidators.validate_checks(report.format("Passed"))
+    result = SOPValidators.validate_checks(report.format("Failed (src/main.py)"))
+    assert not result and result.diagnostics == ["Import check failed"]
+    assert not SOPValidators.validate_checks("TITLE: only")
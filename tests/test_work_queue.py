@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from src.core.engine.sop_executor import Environment
+from src.core.engine.work_queue import DispatchError, SQLiteWorkQueue
+from src.core.engine.worker import Worker
+from tests.helpers import OUTPUT, ScriptedAgent, StubAgent, build, chain
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteWorkQueue(str(tmp_path / "queue.db"), max_deliveries=2)
+
+
+def test_a_job_is_leased_once_and_completed_by_its_holder(queue):
+    job_id = queue.put("Plan", {"n": 1})
+    assert queue.lease("w1", agents=["Ship"]) is None
+
+    job = queue.lease("w1", agents=["Plan"])
+    assert (job.id, job.payload, job.deliveries) == (job_id, {"n": 1}, 1)
+    assert queue.lease("w2") is None
+    assert queue.poll(job_id) is None
+
+    assert not queue.complete(job_id, "w2", {"output": "stolen"})
+    assert queue.complete(job_id, "w1", {"output": "done"})
+    assert queue.wait(job_id, timeout=1) == {"output": "done"}
+
+
+def test_expired_lease_is_redelivered_then_given_up(queue):
+    job_id = queue.put("Plan", {})
+    queue.lease("dead-worker", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    job = queue.lease("w2", lease_seconds=0.05)
+    assert job.id == job_id and job.deliveries == 2
+    # The first worker lost the job; it can neither renew nor complete it
+    assert not queue.heartbeat(job_id, "dead-worker")
+    assert not queue.complete(job_id, "dead-worker", {"output": "late"})
+
+    time.sleep(0.1)
+    assert queue.lease("w3") is None
+    assert "error" in queue.poll(job_id)
+    assert queue.counts() == {"dead": 1}
+
+
+def test_poll_gives_up_on_the_last_delivery_without_another_lease(queue):
+    job_id = queue.put("Plan", {})
+    queue.lease("w1", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert queue.lease("w2", lease_seconds=60).deliveries == 2
+    assert queue.poll(job_id) is None  # the second lease is still live
+
+    assert queue.heartbeat(job_id, "w2", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert "abandoned" in queue.wait(job_id, timeout=1)["error"]
+    assert queue.counts() == {"dead": 1}
+    assert not queue.complete(job_id, "w2", {"output": "late"})
+
+
+def test_cancelled_job_rejects_its_result(queue):
+    job_id = queue.put("Plan", {})
+    queue.lease("w1")
+    queue.cancel(job_id)
+    assert not queue.complete(job_id, "w1", {"output": "done"})
+    with pytest.raises(DispatchError):
+        queue.wait(job_id, timeout=1)
+
+
+def serve(queue, *agents):
+    env = Environment()
+    for agent in agents:
+        env.add_role(agent)
+    stop = threading.Event()
+    worker = Worker(queue, env, worker_id="test-worker", idle_sleep=0.01)
+    thread = threading.Thread(target=worker.run, args=(stop,), daemon=True)
+    thread.start()
+    return stop, thread
+
+
+def test_steps_run_on_a_worker_and_publish_into_the_pool(tmp_path, queue):
+    # The orchestrator keeps only the bindings; acting happens in the worker's copies
+    sop = build(tmp_path, [StubAgent("Plan", "User"), StubAgent("Ship", "Plan")], chain("Plan", "Ship"))
+    sop.queue = queue
+    events = []
+    sop.subscribe(events.append)
+    stop, thread = serve(queue, StubAgent("Plan", "User"), StubAgent("Ship", "Plan"))
+    try:
+        assert sop.run("idea")
+    finally:
+        stop.set()
+        thread.join()
+
+    assert [(m.role, m.content) for m in sop.env.message_pool.messages] == [
+        ("User", "idea"), ("Plan", OUTPUT.format("Plan")), ("Ship", OUTPUT.format("Ship"))]
+    assert [e["step"] for e in events if e["type"] == "dispatched"] == ["Plan", "Ship"]
+    assert queue.counts() == {"done": 2}
+
+
+def test_invalid_remote_output_is_retried(tmp_path, queue):
+    sop = build(tmp_path, [StubAgent("Plan", "User")], chain("Plan", max_retries=1))
+    sop.queue = queue
+    stop, thread = serve(queue, ScriptedAgent([0, 0], bad={1}))
+    try:
+        assert sop.run("idea")
+    finally:
+        stop.set()
+        thread.join()
+    assert [m.content for m in sop.env.message_pool.messages if m.role == "Plan"] == ["garbage", OUTPUT.format("attempt 2")]
+
+
+def test_step_fails_when_no_worker_answers(tmp_path, queue):
+    sop = build(tmp_path, [StubAgent("Plan", "User")], chain("Plan", max_retries=0))
+    sop.queue, sop.dispatch_timeout = queue, 0.1
+    assert not sop.run("idea")
+    assert queue.counts() == {"cancelled": 1}
+
+
+def test_timed_out_dispatch_is_retried(tmp_path, queue):
+    sop = build(tmp_path, [StubAgent("Plan", "User")], chain("Plan", max_retries=1))
+    sop.queue, sop.dispatch_timeout = queue, 0.2
+    events, workers = [], []
+
+    def on_event(event):
+        events.append(event)
+        if event["type"] == "validation_failed":  # a worker only shows up after the first dispatch timed out
+            workers.append(serve(queue, StubAgent("Plan", "User")))
+
+    sop.subscribe(on_event)
+    try:
+        assert sop.run("idea")
+    finally:
+        for stop, thread in workers:
+            stop.set()
+            thread.join()
+    failed = next(e for e in events if e["type"] == "validation_failed")
+    assert failed["attempt"] == 1 and "dispatch failed" in failed["diagnostics"][0]
+    assert queue.counts() == {"cancelled": 1, "done": 1}
+
+
+def test_step_that_never_dispatches_is_reported_failed(tmp_path, queue):
+    sop = build(tmp_path, [StubAgent("Plan", "User")], chain("Plan", max_retries=1))
+    sop.queue, sop.dispatch_timeout = queue, 0.05
+    events = []
+    sop.subscribe(events.append)
+    assert not sop.run("idea")
+    assert [e["attempt"] for e in events if e["type"] == "validation_failed"] == [1, 2]
+    assert any(e["type"] == "step_failed" for e in events)
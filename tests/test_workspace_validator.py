@@ -0,0 +1,58 @@
+from src.core.engine.workspace_validator import WorkspaceValidator, module_name
+
+
+def write(root, rel_path, text):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_module_name():
+    assert module_name("src/main.py") == "src.main"
+    assert module_name("pkg/__init__.py") == "pkg"
+    assert module_name("scripts/run-me.py") is None
+
+
+def test_reports_syntax_and_import_errors(tmp_path):
+    root = tmp_path / "project"
+    write(root, "src/main.py", "def main():\n    return 1\n")
+    write(root, "src/broken.py", "def main(:\n")
+    write(root, "src/bad_import.py", "import does_not_exist_anywhere\n")
+    validator = WorkspaceValidator(cache_path=str(tmp_path / "cache.json"), parallel_threshold=2, max_workers=2)
+
+    report = validator.validate(str(root))
+    assert [f["file"] for f in report["syntax_errors"]] == ["src/broken.py"]
+    assert [f["file"] for f in report["import_errors"]] == ["src/bad_import.py"]
+    assert report["cached"] == 0
+
+
+def test_unchanged_files_are_served_from_cache(tmp_path):
+    root = tmp_path / "project"
+    write(root, "src/main.py", "X = 1\n")
+    write(root, "src/util.py", "Y = 2\n")
+    cache_path = str(tmp_path / "cache.json")
+    WorkspaceValidator(cache_path=cache_path).validate(str(root))
+
+    report = WorkspaceValidator(cache_path=cache_path).validate(str(root))
+    assert report["cached"] == 2
+
+    write(root, "src/util.py", "Y = (\n")
+    report = WorkspaceValidator(cache_path=cache_path).validate(str(root))
+    assert [f["file"] for f in report["syntax_errors"]] == ["src/util.py"]
+    # main.py is not recompiled, but the changed tree means its import is checked again
+    main = report["files"][0]
+    assert (main["file"], main["cached"], main["syntax_ms"]) == ("src/main.py", False, 0.0) and main["import_ms"] > 0
+
+
+def test_import_results_follow_the_files_they_import(tmp_path):
+    root = tmp_path / "project"
+    write(root, "src/__init__.py", "")
+    write(root, "src/main.py", "from src import util\n")
+    write(root, "src/util.py", "X = 1\n")
+    validator = WorkspaceValidator(cache_path=str(tmp_path / "cache.json"))
+    assert validator.validate(str(root))["import_errors"] == []
+
+    (root / "src" / "util.py").unlink()
+    report = validator.validate(str(root))
+    assert [f["file"] for f in report["import_errors"]] == ["src/main.py"]
+    assert not report["files"][1]["cached"]